@@ -0,0 +1,27 @@
+# Exports are imported on first use, so `python -m ampliflow` does not pay for requests or asyncio
+# before a command needs them.
+_EXPORTS = {
+    'ExecClient': 'exec_client',
+    'find_kpi_by_name': 'exec_client',
+    'KpiCatalog': 'kpi_catalog',
+    'MonthlySeries': 'series',
+    'SnapshotStore': 'delta',
+    'diff_values': 'delta',
+    'push_values': 'delta',
+    'SyncJob': 'async_sync',
+    'SyncResult': 'async_sync',
+    'run_sync': 'async_sync',
+    'sync_kpis': 'async_sync',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    import importlib
+
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from .delta import push_values
+from .kpi_catalog import KpiCatalog
+from .item_index import content_hash
+from .metrics import metrics
+from .transport import ApiError
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 10
+
+
+class SyncJob(NamedTuple):
+    kpi_name: str
+    values: list
+
+
+@dataclass
+class SyncResult:
+    kpi_name: str
+    status: str
+    kpi_id: str = None
+    data_source_id: str = None
+    data_source: dict = None
+    sent: int = 0
+
+
+async def _resolve(client, job, kpi, call):
+    try:
+        data_sources = await call(client.get_manual_data_sources, kpi['id'])
+    except ApiError as e:
+        log.error(f'KPI "{job.kpi_name}": {e}')
+        return SyncResult(job.kpi_name, 'error', kpi_id=kpi['id'])
+    if not data_sources:
+        log.error(f'No manual data sources found for KPI {kpi["id"]}.')
+        return SyncResult(job.kpi_name, 'no_data_source', kpi_id=kpi['id'])
+
+    # Assuming we need to update the first manual data source
+    data_source = data_sources[0]
+    return SyncResult(job.kpi_name, 'resolved', kpi_id=kpi['id'], data_source_id=data_source['id'],
+                      data_source=data_source)
+
+
+async def _update(client, job, result, call, delta, snapshots, checkpoint=None, values_hash=None):
+    try:
+        sent = await call(push_values, client, result.data_source, job.values, delta, snapshots, False)
+    except ApiError as e:
+        log.error(f'KPI "{job.kpi_name}": {e}')
+        result.status = 'error'
+        return result
+    result.sent = len(sent)
+    result.status = 'updated' if sent else 'unchanged'
+    if checkpoint is not None:
+        # Recorded as soon as the KPI is pushed, so a crash later in the push phase keeps it.
+        # A local SQLite write, not queued behind the other requests.
+        checkpoint.record('kpi', job.kpi_name, values_hash)
+    return result
+
+
+async def sync_kpis(client, jobs, concurrency=DEFAULT_CONCURRENCY, catalog=None, delta=None, snapshots=None,
+                    checkpoint=None):
+    """
+    Pushes the values of every (kpi_name, values) job to the first manual data source of its KPI.
+
+    The KPI catalog is fetched once, then the manual data sources of all jobs are resolved
+    concurrently and the PATCHes are sent concurrently, with at most `concurrency` requests
+    in flight. Requests run on the client's pooled session in worker threads, so the pool
+    size of the client should be at least `concurrency`.
+
+    Pass a KpiCatalog as `catalog` to serve the KPI lookups from its cache. `delta` and
+    `snapshots` are passed on to push_values(), so in delta mode unchanged months are not sent.
+    A job whose requests fail gets the status 'error', the other jobs still run.
+
+    With a Checkpoint, every pushed KPI is recorded with a hash of its values, and a resumed run
+    skips the KPIs that were already pushed with the same values.
+    """
+    jobs = [SyncJob(*job) for job in jobs]
+    if catalog is None:
+        catalog = KpiCatalog(client, persist=False)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = await _sync(client, catalog, jobs, bounded_caller(executor, concurrency), delta, snapshots,
+                              checkpoint)
+    if snapshots is not None:
+        snapshots.save()
+    return results
+
+
+def bounded_caller(executor, concurrency):
+    """
+    Returns an async function that runs a blocking call on `executor`, with at most
+    `concurrency` calls in flight.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(func, *args):
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    return call
+
+
+async def _sync(client, catalog, jobs, call, delta, snapshots, checkpoint=None):
+    pushed = checkpoint.load('kpi') if checkpoint is not None else {}
+    hashes = [content_hash(job.values) for job in jobs] if checkpoint is not None else [None] * len(jobs)
+    results = [None] * len(jobs)
+    for index, job in enumerate(jobs):
+        if hashes[index] is not None and pushed.get(job.kpi_name) == hashes[index]:
+            log.info(f'KPI "{job.kpi_name}" was already pushed by the resumed run.')
+            results[index] = SyncResult(job.kpi_name, 'unchanged')
+    if all(results):
+        return results
+
+    with metrics.phase('resolve'):
+        await call(catalog.refresh)
+
+        pending = {}
+        for index, job in enumerate(jobs):
+            if results[index] is not None:
+                continue
+            kpi = catalog.find_by_name(job.kpi_name)
+            if not kpi:
+                log.error(f'KPI "{job.kpi_name}" not found.')
+                results[index] = SyncResult(job.kpi_name, 'kpi_not_found')
+            else:
+                pending[index] = _resolve(client, job, kpi, call)
+
+        resolved = await asyncio.gather(*pending.values())
+
+    updates = {}
+    for index, result in zip(pending, resolved):
+        results[index] = result
+        if result.data_source_id is not None:
+            updates[index] = _update(client, jobs[index], result, call, delta, snapshots, checkpoint, hashes[index])
+
+    with metrics.phase('push'):
+        await asyncio.gather(*updates.values())
+    log.info(f'Synced {len(updates)} of {len(jobs)} KPIs.')
+    return results
+
+
+def run_sync(client, jobs, concurrency=DEFAULT_CONCURRENCY, catalog=None, delta=None, snapshots=None,
+             checkpoint=None):
+    return asyncio.run(sync_kpis(client, jobs, concurrency=concurrency, catalog=catalog,
+                                 delta=delta, snapshots=snapshots, checkpoint=checkpoint))
@@ -0,0 +1,102 @@
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+from .kpi_catalog import cache_dir
+
+log = logging.getLogger(__name__)
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+class Journal:
+    """
+    SQLite journal of the durable progress of runs: completed pages, pushed KPIs and created items,
+    keyed by a run key such as 'mailerlite:12345'. Lets a failed run be resumed where it stopped.
+    """
+
+    def __init__(self, path=None):
+        path = Path(path or cache_dir() / 'journal.sqlite')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' run TEXT NOT NULL,'
+            ' kind TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' PRIMARY KEY (run, kind, key))'
+        )
+        self.connection.commit()
+
+    def checkpoint(self, run_key, resume=False):
+        """
+        Returns the Checkpoint of `run_key`. Unless `resume` is set, the progress of an earlier
+        run with the same key is dropped and the run starts over.
+        """
+        checkpoint = Checkpoint(self, run_key)
+        if not resume:
+            checkpoint.clear()
+        else:
+            with self._lock:
+                count = self.connection.execute('SELECT COUNT(*) FROM entries WHERE run = ?', (run_key,)).fetchone()[0]
+            log.info(f'Resuming {run_key} from {count} checkpoints.' if count else f'Nothing to resume for {run_key}.')
+        return checkpoint
+
+    def close(self):
+        self.connection.close()
+
+
+def get_journal(path=None):
+    """
+    Returns the process-wide Journal of `path` (journal.sqlite in AF_CACHE_DIR by default), so the
+    runs of one process share one connection.
+    """
+    path = Path(path or cache_dir() / 'journal.sqlite')
+    with _journals_lock:
+        if path not in _journals:
+            _journals[path] = Journal(path)
+        return _journals[path]
+
+
+class Checkpoint:
+    """
+    The progress of one run. Entries are grouped by kind ('page', 'kpi', 'item') and written
+    right away, so they survive a crash.
+    """
+
+    def __init__(self, journal, run_key):
+        self.journal = journal
+        self.run_key = run_key
+
+    def load(self, kind):
+        """
+        Returns {key: value} of every recorded entry of `kind`.
+        """
+        with self.journal._lock:
+            rows = self.journal.connection.execute(
+                'SELECT key, value FROM entries WHERE run = ? AND kind = ?', (self.run_key, kind)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def record(self, kind, key, value):
+        self.record_many(kind, [(key, value)])
+
+    def record_many(self, kind, entries):
+        with self.journal._lock, self.journal.connection:
+            self.journal.connection.executemany(
+                'INSERT OR REPLACE INTO entries (run, kind, key, value) VALUES (?, ?, ?, ?)',
+                [(self.run_key, kind, str(key), json.dumps(value)) for key, value in entries])
+
+    def clear(self):
+        with self.journal._lock, self.journal.connection:
+            self.journal.connection.execute('DELETE FROM entries WHERE run = ?', (self.run_key,))
+
+    def complete(self):
+        """
+        Marks the run as done, so the next run starts from scratch.
+        """
+        self.clear()
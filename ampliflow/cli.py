@@ -0,0 +1,99 @@
+"""
+Single entry point for the integrations: `python -m ampliflow <command>`.
+
+Only argparse and logging are imported up front. The integration of a command, and the SDKs it
+needs (requests, the GA4 gRPC client), are imported after the command is chosen.
+"""
+import sys
+import logging
+import argparse
+import importlib
+
+log = logging.getLogger(__name__)
+
+# command: (integration module, help)
+COMMANDS = {
+    'wint': ('ampliflow.integrations.wint', 'Sync Wint result report rows, by default revenue into the "Revenue" KPI.'),
+    'mailerlite': ('ampliflow.integrations.mailerlite', 'Sync new MailerLite subscribers per month into the "Subscribers" KPI.'),
+    'ga-visitors': ('ampliflow.integrations.ga_visitors', 'Sync GA4 active users into the "Total website visitors" KPI.'),
+    'ga-conversions': ('ampliflow.integrations.ga_conversions', 'Sync GA4 conversion events into the "Inbound leads" KPI.'),
+    'custom-list': ('ampliflow.integrations.custom_list', 'Run the custom list example.'),
+    'daemon': ('ampliflow.integrations.daemon', 'Run KPI syncs on their own intervals in one resident process.'),
+}
+
+
+def add_global_options(parser, suppress=False):
+    value_default = argparse.SUPPRESS if suppress else None
+    flag_default = argparse.SUPPRESS if suppress else False
+    parser.add_argument('--env-file', default=value_default, help='Path to the .env file (default: nearest .env).')
+    parser.add_argument('-v', '--verbose', action='store_true', default=flag_default,
+                        help='Log debug output, including payloads.')
+    parser.add_argument('--metrics', metavar='FILE', default=value_default,
+                        help='Write request and phase metrics to FILE, as JSON if it ends in .json, '
+                             'otherwise as Prometheus text.')
+    parser.add_argument('--resume', action='store_true', default=flag_default,
+                        help='Continue the last failed run of the command from its checkpoint.')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='ampliflow', description='AmpliFlow KPI and custom list integrations.')
+    add_global_options(parser)
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    # The global options are accepted after the command too, as the integration scripts pass them there.
+    # SUPPRESS keeps a subcommand from resetting an option given before it.
+    parsers = {name: subparsers.add_parser(name, help=help_text) for name, (_, help_text) in COMMANDS.items()}
+    for command_parser in parsers.values():
+        add_global_options(command_parser, suppress=True)
+    for name in ('wint', 'mailerlite', 'ga-visitors', 'ga-conversions'):
+        parsers[name].add_argument('--kpi', help='Name of the AmpliFlow KPI to update.')
+    parsers['wint'].add_argument('--start', default='2024-04', help='First month to sync, as YYYY-MM (default: 2024-04).')
+    parsers['wint'].add_argument('--window', type=int, metavar='MONTHS',
+                                 help='Months per report request, 3 for quarters or 12 for years (default: WINT_WINDOW_MONTHS or 12).')
+    parsers['wint'].add_argument('--refresh', action='store_true',
+                                 help='Request the closed windows again instead of reading them from the report cache.')
+    parsers['wint'].add_argument('--row', action='append', metavar='ID=KPI',
+                                 help='Report row to sync into a KPI, such as Costs=Costs; repeatable '
+                                      '(default: Revenue into --kpi).')
+    parsers['mailerlite'].add_argument('--group', help='MailerLite group id (default: MAILERLITE_GROUP_ID).')
+    parsers['daemon'].add_argument('--job', action='append', metavar='"INTERVAL COMMAND [OPTIONS]"',
+                                   help='A sync to run on an interval such as 90s, 15m, 1h or 1d, '
+                                        'for example --job "1h wint --row Costs=Costs"; repeatable.')
+    parsers['daemon'].add_argument('--jitter', type=float, default=0.1,
+                                   help='Random delay of each run, as a fraction of its interval (default: 0.1).')
+    parsers['daemon'].add_argument('--status-file', help='Write the last run duration and status of every job here as JSON.')
+    parsers['custom-list'].add_argument('--list-name', default='GDPR_en_Registry', help='Name of the custom list.')
+    parsers['custom-list'].add_argument('--bulk', type=int, default=0, metavar='N',
+                                        help='Also sync N demo items "Bulk item 1".."Bulk item N" into the list '
+                                             'with sync_items (default: 0, off).')
+    return parser
+
+
+def setup_logging(verbose=False):
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]  # Log to stdout
+    )
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging(args.verbose)
+
+    from .config import load_config
+
+    from .transport import ApiError
+
+    config = load_config(args.env_file)
+    integration = importlib.import_module(COMMANDS[args.command][0])
+    try:
+        return integration.main(config, args)
+    except ApiError as e:
+        log.error(f'{e}')
+        return 1
+    finally:
+        if args.metrics:
+            from .metrics import metrics
+
+            metrics.write(args.metrics)
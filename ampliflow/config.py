@@ -0,0 +1,51 @@
+import os
+from dataclasses import dataclass
+
+_config = None
+
+
+@dataclass(frozen=True)
+class Config:
+    af_base_url: str = None
+    af_api_key: str = None
+    wint_username: str = None
+    wint_password: str = None
+    mailerlite_api_key: str = None
+    mailerlite_group_id: str = None
+    ga4_property_id: str = None
+    ga4_properties: str = None
+    conversion_events: tuple = ()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            af_base_url=os.environ.get('AF_BASE_URL'),
+            af_api_key=os.environ.get('AF_API_KEY'),
+            wint_username=os.environ.get('WINT_USERNAME'),
+            wint_password=os.environ.get('WINT_PASSWORD'),
+            mailerlite_api_key=os.environ.get('MAILERLITE_API_KEY'),
+            mailerlite_group_id=os.environ.get('MAILERLITE_GROUP_ID'),
+            ga4_property_id=os.environ.get('GA4_PROPERTY_ID'),
+            ga4_properties=os.environ.get('GA4_PROPERTIES'),
+            conversion_events=tuple(event for event in os.environ.get('CONVERSION_EVENTS', '').split(',') if event),
+        )
+
+    def require(self, *names):
+        """
+        Returns the missing settings among `names`, by their environment variable name.
+        """
+        return [name.upper() for name in names if not getattr(self, name)]
+
+
+def load_config(env_file=None):
+    """
+    Loads `env_file`, or the nearest .env above the working directory or this repository, into the
+    environment once per process and returns the Config.
+    """
+    global _config
+    if _config is None:
+        from dotenv import load_dotenv, find_dotenv
+
+        load_dotenv(env_file or find_dotenv(usecwd=True) or find_dotenv())
+        _config = Config.from_env()
+    return _config
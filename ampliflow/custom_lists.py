@@ -0,0 +1,313 @@
+import time
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .item_index import content_hash
+from .transport import ApiError
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 100
+
+
+def find_custom_list_by_name(custom_lists, name):
+    for custom_list in custom_lists:
+        if custom_list.get('name') == name:
+            log.info(f'FOUND: Custom list "{name}"')
+            return custom_list
+    return None
+
+
+def _default_payload(prop_id, prop_type):
+    # For non-title properties, set to default or empty values based on type. Handle as you see fit.
+    if prop_type == 'string':
+        return {'id': prop_id, 'value': ''}
+    elif prop_type == 'int':
+        return {'id': prop_id, 'value': 0}
+    elif prop_type == 'boolean':
+        return {'id': prop_id, 'value': False}
+    elif prop_type in ['multiselect', 'multicheckbox']:
+        return {'id': prop_id, 'selectedIds': []}
+    else:
+        # 'date', 'datetime' and unknown types
+        return {'id': prop_id, 'value': None}
+
+
+def _identity(value):
+    return value
+
+
+class ListSchema:
+    """
+    Properties payload template for one custom list, compiled once from its property schema.
+
+    The default payload of every property and the title slot with its coercion are worked out
+    up front, so payload() only copies the template list and sets the title. The default
+    property dicts are shared between payloads and must not be modified.
+    """
+
+    def __init__(self, custom_list_properties):
+        self._template = []
+        self._title_index = None
+        self._title_id = None
+        self._coerce_title = _identity
+
+        for prop in custom_list_properties:
+            prop_label = prop.get('label', '').lower()
+            prop_type = prop.get('type', '').lower()
+            prop_id = prop.get('id')
+
+            if prop_label == 'title':
+                self._title_index = len(self._template)
+                self._title_id = prop_id
+                self._coerce_title = int if prop_type == 'int' else _identity
+                self._template.append(None)
+            else:
+                self._template.append(_default_payload(prop_id, prop_type))
+
+        if self._title_index is None:
+            raise ValueError('Title property not found in the custom list.')
+
+    @classmethod
+    def from_custom_list(cls, custom_list):
+        return cls(custom_list.get('properties', []))
+
+    def payload(self, title_value):
+        properties_payload = self._template.copy()
+        properties_payload[self._title_index] = {'id': self._title_id, 'value': self._coerce_title(title_value)}
+        return properties_payload
+
+
+def prepare_properties(custom_list_properties, title_value):
+    """
+    Builds a single properties payload. Compile a ListSchema instead when building many.
+    """
+    return ListSchema(custom_list_properties).payload(title_value)
+
+
+@dataclass
+class ItemResult:
+    index: int
+    action: str
+    item_id: object = None
+    status_code: int = None
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+@dataclass
+class BulkResult:
+    results: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def items_per_second(self):
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+
+def _item_id(response):
+    if response.status_code == 204 or not response.content:
+        return None
+    body = response.json()
+    return body.get('id') if isinstance(body, dict) else body
+
+
+def _upsert_one(client, custom_list_id, index, row):
+    """
+    Creates the item, or updates it when the row has an 'id'. Errors are returned, not raised,
+    so one bad row does not stop the rest of the import.
+    """
+    item_id = row.get('id')
+    payload = {'customListId': custom_list_id, 'properties': row['properties']}
+    if item_id is None:
+        action, method, ok_codes = 'create', 'POST', (200, 201)
+    else:
+        action, method, ok_codes = 'update', 'PATCH', (200, 204)
+        payload['id'] = item_id
+
+    try:
+        response = client.send(method, 'custom-list-items', payload)
+    except ApiError as e:
+        return ItemResult(index, action, item_id, error=str(e))
+
+    if response.status_code not in ok_codes:
+        return ItemResult(index, action, item_id, response.status_code, error=response.text)
+    return ItemResult(index, action, item_id if item_id is not None else _item_id(response), response.status_code)
+
+
+def _upsert_batch(client, custom_list_id, batch_path, batch):
+    """
+    Sends `batch` of (index, row) to the batch endpoint. Returns the per-item results, or None
+    if the endpoint does not exist. A failed request fails every item of the batch.
+    """
+    items = []
+    for _, row in batch:
+        item = {'customListId': custom_list_id, 'properties': row['properties']}
+        if row.get('id') is not None:
+            item['id'] = row['id']
+        items.append(item)
+
+    try:
+        response = client.send('POST', batch_path, items)
+    except ApiError as e:
+        return [ItemResult(index, 'batch', row.get('id'), error=str(e)) for index, row in batch]
+    if response.status_code in (404, 405):
+        return None
+
+    results = []
+    if response.status_code not in (200, 201, 204):
+        for index, row in batch:
+            results.append(ItemResult(index, 'batch', row.get('id'), response.status_code, error=response.text))
+        return results
+
+    body = response.json() if response.content else None
+    ids = body if isinstance(body, list) and len(body) == len(batch) else [None] * len(batch)
+    for (index, row), item_id in zip(batch, ids):
+        if isinstance(item_id, dict):
+            item_id = item_id.get('id')
+        results.append(ItemResult(index, 'update' if row.get('id') is not None else 'create',
+                                  row.get('id') if item_id is None else item_id, response.status_code))
+    return results
+
+
+def bulk_upsert(client, custom_list_id, rows, concurrency=DEFAULT_CONCURRENCY,
+                batch_path=None, batch_size=DEFAULT_BATCH_SIZE, on_results=None):
+    """
+    Creates or updates custom list items from an iterable of rows, where each row is
+    {'properties': [...]} to create an item or {'id': ..., 'properties': [...]} to update one.
+
+    Rows are read lazily and sent by `concurrency` workers over the client's pooled session,
+    with at most `concurrency` requests in flight. If `batch_path` is given, rows are first sent
+    in batches of `batch_size` to that Exec endpoint; if it answers 404/405 the import falls back
+    to one request per item. Returns a BulkResult with one ItemResult per row, in row order.
+
+    `on_results` is called with every list of ItemResults as soon as they are collected, so the
+    caller can record progress while the import runs.
+    """
+    start = time.perf_counter()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = set()
+
+        def submit(func, *args):
+            if len(in_flight) >= concurrency:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    in_flight.remove(future)
+                    collect(future.result())
+            in_flight.add(executor.submit(func, *args))
+
+        def collect(result):
+            if result is None:
+                return
+            result = result if isinstance(result, list) else [result]
+            results.extend(result)
+            if on_results is not None:
+                on_results(result)
+
+        rows = enumerate(rows)
+        if batch_path:
+            batch = []
+            for index, row in rows:
+                batch.append((index, row))
+                if len(batch) == batch_size:
+                    break
+            batch_results = _upsert_batch(client, custom_list_id, batch_path, batch) if batch else []
+            if batch_results is None:
+                log.info(f'No batch endpoint at {batch_path}, sending one request per item.')
+                for index, row in batch:
+                    submit(_upsert_one, client, custom_list_id, index, row)
+            else:
+                collect(batch_results)
+                batch = []
+                for index, row in rows:
+                    batch.append((index, row))
+                    if len(batch) == batch_size:
+                        submit(_upsert_batch, client, custom_list_id, batch_path, batch)
+                        batch = []
+                if batch:
+                    submit(_upsert_batch, client, custom_list_id, batch_path, batch)
+
+        for index, row in rows:
+            submit(_upsert_one, client, custom_list_id, index, row)
+
+        for future in in_flight:
+            collect(future.result())
+
+    results.sort(key=lambda result: result.index)
+    bulk_result = BulkResult(results, time.perf_counter() - start)
+    log.info(f'Upserted {len(results) - len(bulk_result.failed)} of {len(results)} items '
+             f'in {bulk_result.elapsed:.1f}s ({bulk_result.items_per_second:.0f} items/sec).')
+    return bulk_result
+
+
+@dataclass
+class SyncSummary:
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: list = field(default_factory=list)
+
+
+def sync_items(client, custom_list_id, rows, index, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Idempotently syncs (key, properties_payload) rows into the custom list using an ItemIndex.
+
+    Rows whose key is unknown are created, rows whose properties changed since the last sync
+    are updated, and unchanged rows are skipped without any request. Keys must be unique
+    within one call. Every item is written to the index as soon as it is done, so running the
+    sync again after a failure only sends the rows that did not make it.
+    """
+    known = index.load(custom_list_id)
+    summary = SyncSummary()
+    pending = {}
+
+    def plan():
+        for key, properties_payload in rows:
+            item_hash = content_hash(properties_payload)
+            indexed = known.get(key)
+            if indexed is not None and indexed[1] == item_hash:
+                summary.skipped += 1
+                continue
+            pending[len(pending)] = (key, item_hash)
+            if indexed is None:
+                yield {'properties': properties_payload}
+            else:
+                yield {'id': indexed[0], 'properties': properties_payload}
+
+    def record(item_results):
+        synced = []
+        stale = []
+        for item_result in item_results:
+            key, item_hash = pending[item_result.index]
+            if not item_result.ok:
+                summary.failed.append((key, item_result))
+                if item_result.action == 'update' and item_result.status_code == 404:
+                    # Deleted in AmpliFlow, so create it again on the next sync
+                    stale.append(key)
+            elif item_result.item_id is None:
+                summary.failed.append((key, item_result))
+            else:
+                synced.append((key, item_result.item_id, item_hash))
+                if item_result.action == 'create':
+                    summary.created += 1
+                else:
+                    summary.updated += 1
+        index.put_many(custom_list_id, synced)
+        index.delete_many(custom_list_id, stale)
+
+    bulk_upsert(client, custom_list_id, plan(), concurrency=concurrency, on_results=record)
+
+    log.info(f'Custom list sync: {summary.created} created, {summary.updated} updated, '
+             f'{summary.skipped} unchanged, {len(summary.failed)} failed.')
+    return summary
@@ -0,0 +1,125 @@
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+
+from .kpi_catalog import default_cache_path
+from . import months
+
+log = logging.getLogger(__name__)
+
+
+def delta_sync_enabled():
+    return os.environ.get('AF_DELTA_SYNC', '').lower() in ('1', 'true', 'yes')
+
+
+def month_key(entry):
+    """
+    Returns the (year, month) of a value entry in either the {'year', 'month'} or the
+    {'date': ISO string} format.
+    """
+    if 'year' in entry:
+        return int(entry['year']), int(entry['month'])
+    return months.month_key(entry['date'])
+
+
+def index_values(values):
+    return {month_key(entry): entry['value'] for entry in values or []}
+
+
+def diff_values(old_values, new_values):
+    """
+    Returns the entries of `new_values` that are missing from, or differ in, `old_values`.
+    `old_values` is a {(year, month): value} dict as built by index_values().
+    """
+    changed = []
+    for entry in new_values:
+        key = month_key(entry)
+        if key not in old_values or old_values[key] != entry['value']:
+            changed.append(entry)
+    return changed
+
+
+class SnapshotStore:
+    """
+    Last pushed values per manual data source, persisted as JSON at `path`.
+    Used as the baseline for delta syncs when the data source does not return its values.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    stored = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning(f'Ignoring unreadable snapshot file {self.path}: {e}')
+                stored = {}
+            for data_source_id, points in stored.items():
+                self._snapshots[data_source_id] = {(year, month): value for year, month, value in points}
+
+    @classmethod
+    def for_client(cls, client):
+        return cls(default_cache_path(client, 'snapshots'))
+
+    def get(self, data_source_id):
+        with self._lock:
+            return dict(self._snapshots.get(str(data_source_id), {}))
+
+    def update(self, data_source_id, values):
+        with self._lock:
+            self._snapshots.setdefault(str(data_source_id), {}).update(index_values(values))
+
+    def save(self):
+        # Held while writing too, so concurrent syncs sharing the store do not race on the file
+        with self._lock:
+            stored = {
+                data_source_id: [[year, month, value] for (year, month), value in sorted(points.items())]
+                for data_source_id, points in self._snapshots.items()
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.path)
+
+
+def push_values(client, data_source, values, delta=None, snapshots=None, save=True):
+    """
+    Updates the manual data source with `values`.
+
+    In delta mode (`delta=True`, or AF_DELTA_SYNC set when `delta` is None) only the months that
+    are new or changed are sent, compared with the values the data source returned or, if it
+    returned none, with the last pushed snapshot. Nothing is sent when no month changed.
+    Returns the entries that were sent.
+    """
+    if delta is None:
+        delta = delta_sync_enabled()
+    data_source_id = data_source['id']
+
+    if not delta:
+        client.update_manual_data_source(data_source_id, values)
+        return values
+
+    if data_source.get('values') is not None:
+        baseline = index_values(data_source['values'])
+    elif snapshots is not None:
+        baseline = snapshots.get(data_source_id)
+    else:
+        baseline = {}
+
+    changed = diff_values(baseline, values)
+    if not changed:
+        log.info(f'Manual data source {data_source_id} is up to date, skipping update.')
+    else:
+        log.info(f'Sending {len(changed)} of {len(values)} months to manual data source {data_source_id}.')
+        client.update_manual_data_source(data_source_id, changed)
+
+    if snapshots is not None:
+        snapshots.update(data_source_id, values)
+        if save:
+            snapshots.save()
+    return changed
@@ -0,0 +1,152 @@
+import os
+import sys
+import logging
+from requests.adapters import HTTPAdapter
+
+from .metrics import endpoint_name
+from .transport import Session, raise_for_status
+
+log = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+
+class ExecClient:
+    """
+    Client for the AmpliFlow Exec API.
+
+    All calls go through one keep-alive requests.Session, so a sync that touches
+    many KPIs reuses the same TCP/TLS connections instead of opening a new one per call.
+    Transient failures are retried (see transport.Session) and failed calls raise an ApiError.
+    """
+
+    def __init__(self, base_url, api_key, pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=None, rate=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+
+        self.session = Session(max_retries=max_retries, rate=rate)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+        Creates a client from AF_BASE_URL and AF_API_KEY. Pool size, timeouts and the request rate
+        can be overridden with AF_POOL_SIZE, AF_CONNECT_TIMEOUT, AF_READ_TIMEOUT and AF_RATE_LIMIT
+        (requests per second).
+        """
+        base_url = os.environ.get('AF_BASE_URL')
+        api_key = os.environ.get('AF_API_KEY')
+        if not base_url or not api_key:
+            log.error('AF_BASE_URL and AF_API_KEY must be set.')
+            sys.exit(1)
+
+        kwargs.setdefault('pool_size', int(os.environ.get('AF_POOL_SIZE', DEFAULT_POOL_SIZE)))
+        kwargs.setdefault('connect_timeout', float(os.environ.get('AF_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)))
+        kwargs.setdefault('read_timeout', float(os.environ.get('AF_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)))
+        if os.environ.get('AF_RATE_LIMIT'):
+            kwargs.setdefault('rate', float(os.environ['AF_RATE_LIMIT']))
+        return cls(base_url, api_key, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _url(self, path):
+        return f'{self.base_url}/api/Exec/{path}/{self.api_key}'
+
+    def send(self, method, path, payload=None, headers=None):
+        """
+        Sends a request to the Exec endpoint at `path` and returns the response without checking it.
+        """
+        url = self._url(path)
+        # The API key is the last path segment, so it is masked in metrics and logs
+        return self.session.request(method, url, json=payload, headers=headers, timeout=self.timeout,
+                                    endpoint=endpoint_name(method, url, self.api_key))
+
+    def get_kpis(self):
+        kpis, _, _ = self.get_kpis_conditional()
+        return kpis
+
+    def get_kpis_conditional(self, etag=None, last_modified=None):
+        """
+        Fetches the KPI catalog with If-None-Match/If-Modified-Since when validators are given.
+        Returns (kpis, etag, last_modified), where kpis is None if the server answered 304 Not Modified.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        response = self.send('GET', 'kpis', headers=headers)
+        if response.status_code == 304:
+            log.info('KPIs not modified.')
+            return None, etag, last_modified
+        raise_for_status(response, 'Error fetching KPIs')
+        log.info('KPIs fetched successfully.')
+        return response.json(), response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+    def get_manual_data_sources(self, kpi_id):
+        response = self.send('GET', f'kpi/manual-data-sources/{kpi_id}')
+        raise_for_status(response, f'Error fetching manual data sources of KPI {kpi_id}')
+        log.info(f'Manual data sources for KPI {kpi_id} fetched successfully.')
+        return response.json()
+
+    def update_manual_data_source(self, data_source_id, values_payload):
+        payload = {
+            'id': data_source_id,
+            'values': values_payload
+        }
+        response = self.send('PATCH', 'kpi/manual-data-sources', payload)
+        raise_for_status(response, f'Error updating manual data source {data_source_id}', (204,))
+        log.info('Manual data source updated successfully.')
+
+    def get_custom_lists(self):
+        response = self.send('GET', 'custom-lists')
+        raise_for_status(response, 'Error fetching custom lists')
+        log.info('Custom lists fetched successfully.')
+        return response.json()
+
+    def create_custom_list_item(self, custom_list_id, properties_payload):
+        payload = {
+            'customListId': custom_list_id,
+            'properties': properties_payload
+        }
+        response = self.send('POST', 'custom-list-items', payload)
+        raise_for_status(response, 'Error creating custom list item', (200, 201))
+        log.info('Item created successfully.')
+        return response.json()
+
+    def update_custom_list_item(self, item_id, custom_list_id, properties_payload):
+        payload = {
+            'id': item_id,
+            'customListId': custom_list_id,
+            'properties': properties_payload
+        }
+        response = self.send('PATCH', 'custom-list-items', payload)
+        raise_for_status(response, f'Error updating custom list item {item_id}', (200, 204))
+        log.info('Item updated successfully.')
+
+
+def find_kpi_by_name(kpis, name):
+    for kpi in kpis:
+        if kpi.get('name') == name:
+            log.info(f'FOUND: KPI "{name}"')
+            return kpi
+    return None
@@ -0,0 +1,307 @@
+import logging
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import NamedTuple
+
+from google.api_core.exceptions import GoogleAPIError
+from google.auth.exceptions import GoogleAuthError
+from google.analytics.data_v1beta import BetaAnalyticsDataClient
+from google.analytics.data_v1beta.types import (
+    BatchRunReportsRequest,
+    RunReportRequest,
+    DateRange,
+    Dimension,
+    Metric,
+    FilterExpression,
+    Filter,
+)
+
+from . import months
+from .ga4_cache import is_closed
+from .metrics import metrics
+from .pipeline import Source, KpiStream, SourceError
+from .series import MonthlySeries
+
+log = logging.getLogger(__name__)
+
+DEFAULT_START_DATE = '2023-01-01'
+MAX_REPORTS_PER_BATCH = 5  # Limit of batchRunReports
+DEFAULT_PAGE_SIZE = 10000  # Rows per page, the GA4 default limit
+DEFAULT_PAGE_WINDOW = 4  # Pages fetched concurrently
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns the process-wide BetaAnalyticsDataClient, so every report shares one gRPC channel.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = BetaAnalyticsDataClient()
+        return _client
+
+
+@dataclass(frozen=True)
+class GaKpi:
+    """
+    A GA4 metric summed per month into an AmpliFlow KPI, optionally limited to rows where
+    `filter_field` is one of `filter_values` (for example eventName in a list of conversion events).
+    `extra_dimensions` are requested after year and month and summed over.
+    """
+    kpi_name: str
+    metric: str
+    filter_values: tuple = ()
+    filter_field: str = 'eventName'
+    extra_dimensions: tuple = ()
+
+
+def build_request(kpi, start_date, end_date):
+    request = RunReportRequest(
+        dimensions=[
+            Dimension(name='year'),
+            Dimension(name='month'),
+            # Any extra dimension, such as 'sessionDefaultChannelGroup' or 'pagePath'
+            *(Dimension(name=name) for name in kpi.extra_dimensions),
+        ],
+        metrics=[
+            Metric(name=kpi.metric),
+        ],
+        date_ranges=[
+            DateRange(start_date=start_date, end_date=end_date),
+        ],
+    )
+    if kpi.filter_values:
+        request.dimension_filter = FilterExpression(
+            filter=Filter(
+                field_name=kpi.filter_field,
+                in_list_filter=Filter.InListFilter(
+                    values=list(kpi.filter_values)
+                )
+            )
+        )
+    return request
+
+
+def parse_metric(value):
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+class ReportRow(NamedTuple):
+    dimensions: tuple
+    metrics: tuple
+
+
+def parse_rows(rows):
+    for row in rows:
+        yield ReportRow(
+            tuple(value.value for value in row.dimension_values),
+            tuple(parse_metric(value.value) for value in row.metric_values),
+        )
+
+
+def _run_page(client, request, offset, page_size):
+    page = RunReportRequest()
+    RunReportRequest.copy_from(page, request)
+    page.offset = offset
+    page.limit = page_size
+    return client.run_report(page)
+
+
+def iter_remaining_rows(request, row_count, offset, client=None, page_size=DEFAULT_PAGE_SIZE,
+                        window=DEFAULT_PAGE_WINDOW):
+    """
+    Yields the ReportRows of `request` from `offset` up to `row_count`, paging with limit/offset.
+    Up to `window` pages are fetched concurrently and rows are yielded in report order, so at most
+    `window` pages are held in memory.
+    """
+    client = client or get_client()
+    offsets = iter(range(offset, row_count, page_size))
+    in_flight = collections.deque()
+
+    with ThreadPoolExecutor(max_workers=max(window, 1)) as executor:
+        def fill():
+            for page_offset in offsets:
+                in_flight.append(executor.submit(_run_page, client, request, page_offset, page_size))
+                if len(in_flight) >= window:
+                    break
+
+        fill()
+        while in_flight:
+            response = in_flight.popleft().result()
+            fill()
+            yield from parse_rows(response.rows)
+
+
+def iter_report_rows(request, client=None, page_size=DEFAULT_PAGE_SIZE, window=DEFAULT_PAGE_WINDOW):
+    """
+    Streams every row of a RunReportRequest (with its property set) as ReportRows. The first page
+    tells the total row count, the rest is fetched by iter_remaining_rows().
+    """
+    client = client or get_client()
+    first = _run_page(client, request, 0, page_size)
+    yield from parse_rows(first.rows)
+    yield from iter_remaining_rows(request, first.row_count, page_size, client, page_size, window)
+
+
+def monthly_totals(rows, totals=None):
+    """
+    Sums the first metric of ReportRows whose first two dimensions are year and month,
+    as {(year, month): value}. Any further dimensions are summed over.
+    """
+    if totals is None:
+        totals = {}
+    for row in rows:
+        key = (int(row.dimensions[0]), int(row.dimensions[1]))
+        totals[key] = totals.get(key, 0) + row.metrics[0]
+    return totals
+
+
+def report_totals(report, request=None, client=None):
+    """
+    Sums a year/month report per month. If the report was truncated by the row limit and its
+    `request` is given, the remaining rows are paged in.
+    """
+    totals = monthly_totals(parse_rows(report.rows))
+    if len(report.rows) < report.row_count:
+        if request is None:
+            log.warning(f'Report truncated at {len(report.rows)} of {report.row_count} rows.')
+        else:
+            monthly_totals(iter_remaining_rows(request, report.row_count, len(report.rows), client), totals)
+    return totals
+
+
+def report_to_values(report, request=None, client=None):
+    return months.to_values(report_totals(report, request, client))
+
+
+def _plan(property_id, kpi, start, end, cache, late_days):
+    """
+    Returns (first month to request or None, cached closed months before it).
+    """
+    cached = cache.load(property_id, kpi) if cache is not None else {}
+    for year_month in months.iter_months(start, end):
+        if year_month not in cached or not is_closed(*year_month, late_days=late_days):
+            break
+    else:
+        return None, cached
+    return year_month, {key: value for key, value in cached.items() if start <= key < year_month}
+
+
+def run_kpi_reports(property_id, kpis, start_date=DEFAULT_START_DATE, end_date=None, client=None,
+                    cache=None, late_days=None):
+    """
+    Runs the reports of all GA KPIs for the property with batchRunReports, up to 5 reports per call,
+    and returns {kpi_name: values}.
+
+    With a MonthCache, closed months are served from the cache and only the months from the first
+    open or uncached one onwards are requested, so a month is re-requested only while it is open
+    or within `late_days` (GA4_LATE_DATA_DAYS) after it ended. Cached reports assume the same
+    month-aligned `start_date` on every run.
+    """
+    client = client or get_client()
+    end_date = end_date or datetime.today().strftime('%Y-%m-%d')
+    start, end = months.month_key(start_date), months.month_key(end_date)
+
+    values_by_kpi = {}
+    pending = []
+    for kpi in kpis:
+        fetch_from, cached = _plan(property_id, kpi, start, end, cache, late_days)
+        values_by_kpi[kpi.kpi_name] = cached
+        if fetch_from is not None:
+            request_start = start_date if fetch_from == start else f'{fetch_from[0]:04d}-{fetch_from[1]:02d}-01'
+            pending.append((kpi, fetch_from, build_request(kpi, request_start, end_date)))
+
+    for offset in range(0, len(pending), MAX_REPORTS_PER_BATCH):
+        chunk = pending[offset:offset + MAX_REPORTS_PER_BATCH]
+        response = client.batch_run_reports(BatchRunReportsRequest(
+            property=f'properties/{property_id}',
+            requests=[request for _, _, request in chunk],
+        ))
+        for (kpi, fetch_from, request), report in zip(chunk, response.reports):
+            if not report.rows:
+                log.warning(f'No GA4 data for KPI "{kpi.kpi_name}".')
+            request.property = f'properties/{property_id}'
+            totals = report_totals(report, request, client)
+            values_by_kpi[kpi.kpi_name].update(totals)
+            if cache is not None:
+                cache.store(property_id, kpi, {
+                    year_month: totals.get(year_month)
+                    for year_month in months.iter_months(fetch_from, end)
+                    if is_closed(*year_month, late_days=late_days)
+                })
+
+    log.info(f'Fetched {len(pending)} of {len(values_by_kpi)} GA4 reports '
+             f'in {-(-len(pending) // MAX_REPORTS_PER_BATCH)} batch calls.')
+    return {
+        kpi_name: months.to_values({key: value for key, value in totals.items() if value is not None})
+        for kpi_name, totals in values_by_kpi.items()
+    }
+
+
+def parse_properties(value, default_kpi_name=None):
+    """
+    Parses a GA4 property list such as '123456=Website visitors - brand A,654321=Website visitors - brand B'
+    into {property_id: kpi_name}. A property without '=' feeds `default_kpi_name`. GaSource sums the
+    months of properties that feed the same KPI.
+    """
+    kpi_names = {}
+    for entry in (value or '').split(','):
+        property_id, _, kpi_name = entry.strip().partition('=')
+        if property_id:
+            kpi_names[property_id] = kpi_name.strip() or default_kpi_name
+    return kpi_names
+
+
+def run_properties(kpis_by_property, cache=None, max_workers=None, **kwargs):
+    """
+    Runs run_kpi_reports() for every {property_id: [GaKpi, ...]} entry concurrently on a thread pool,
+    sharing one GA4 client and its credentials, and returns {property_id: {kpi_name: values}}.
+    """
+    client = kwargs.pop('client', None) or get_client()
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(kpis_by_property), 1)) as executor:
+        futures = {
+            property_id: executor.submit(run_kpi_reports, property_id, kpis, client=client, cache=cache, **kwargs)
+            for property_id, kpis in kpis_by_property.items()
+        }
+        return {property_id: future.result() for property_id, future in futures.items()}
+
+
+class GaSource(Source):
+    """
+    Pipeline source of GA4 KPIs, {property_id: [GaKpi, ...]}. All properties are fetched concurrently
+    by run_properties(); extra keyword arguments are passed on to it.
+    """
+    name = 'ga4'
+
+    def __init__(self, kpis_by_property, cache=None, **kwargs):
+        self.kpis_by_property = kpis_by_property
+        self.cache = cache
+        self.kwargs = kwargs
+
+    def streams(self):
+        try:
+            # Includes summing the report rows per month, which happens as the pages arrive
+            with metrics.phase('fetch'):
+                values_by_property = run_properties(self.kpis_by_property, cache=self.cache, **self.kwargs)
+        except (GoogleAPIError, GoogleAuthError) as e:
+            # Bad credentials, missing permissions or an exhausted quota
+            raise SourceError(f'GA4 reports failed: {e}') from e
+        # Properties that feed the same KPI, such as a plain list of property IDs, are summed per month
+        with metrics.phase('aggregate'):
+            totals_by_kpi = {}
+            for values_by_kpi in values_by_property.values():
+                for kpi_name, values in values_by_kpi.items():
+                    totals = totals_by_kpi.setdefault(kpi_name, {})
+                    for entry in values:
+                        key = (entry['year'], entry['month'])
+                        totals[key] = totals.get(key, 0) + entry['value']
+            series_by_kpi = {kpi_name: MonthlySeries.from_totals(totals) for kpi_name, totals in totals_by_kpi.items()}
+        for kpi_name, series in series_by_kpi.items():
+            yield KpiStream(kpi_name, series)
@@ -0,0 +1,90 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+from . import months
+from .kpi_catalog import cache_dir
+
+DEFAULT_LATE_DATA_DAYS = 3
+
+
+def late_data_days():
+    return int(os.environ.get('GA4_LATE_DATA_DAYS', DEFAULT_LATE_DATA_DAYS))
+
+
+def is_closed(year, month, today=None, late_days=None):
+    """
+    A month is closed once it has ended and the late data window after it has passed,
+    so GA4 will no longer change its numbers.
+    """
+    late_days = late_data_days() if late_days is None else late_days
+    return months.is_closed(year, month, late_days, today)
+
+
+def report_key(kpi):
+    """
+    Identifies the report of a GaKpi independently of the AmpliFlow KPI it feeds: metric plus filter hash.
+    """
+    definition = json.dumps([kpi.filter_field, sorted(kpi.filter_values)]) if kpi.filter_values else ''
+    if kpi.extra_dimensions:
+        definition += json.dumps(sorted(kpi.extra_dimensions))
+    return f'{kpi.metric}:{hashlib.sha1(definition.encode()).hexdigest()[:12]}'
+
+
+class MonthCache:
+    """
+    SQLite cache of closed GA4 months keyed by (property, metric, filter hash, year, month).
+    A NULL value records a closed month that had no data, so it is not requested again.
+    """
+
+    def __init__(self, path=None):
+        path = Path(path or cache_dir() / 'ga4-months.sqlite')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS months ('
+            ' property TEXT NOT NULL,'
+            ' report TEXT NOT NULL,'
+            ' year INTEGER NOT NULL,'
+            ' month INTEGER NOT NULL,'
+            ' value REAL,'
+            ' PRIMARY KEY (property, report, year, month))'
+        )
+        self.connection.commit()
+
+    def load(self, property_id, kpi):
+        """
+        Returns {(year, month): value or None} for every cached month of the report.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT year, month, value FROM months WHERE property = ? AND report = ?',
+                (str(property_id), report_key(kpi))).fetchall()
+        return {(year, month): _number(value) for year, month, value in rows}
+
+    def store(self, property_id, kpi, values_by_month):
+        with self._lock, self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO months (property, report, year, month, value) VALUES (?, ?, ?, ?, ?)',
+                [(str(property_id), report_key(kpi), year, month, value)
+                 for (year, month), value in values_by_month.items()])
+
+    def clear(self, property_id=None):
+        with self._lock, self.connection:
+            if property_id is None:
+                self.connection.execute('DELETE FROM months')
+            else:
+                self.connection.execute('DELETE FROM months WHERE property = ?', (str(property_id),))
+
+    def close(self):
+        self.connection.close()
+
+
+def _number(value):
+    if value is None:
+        return None
+    return int(value) if float(value).is_integer() else value
@@ -0,0 +1,54 @@
+import logging
+
+log = logging.getLogger(__name__)
+
+
+def run_sources(sources, af_client=None, catalog=None, snapshots=None, checkpoint=None):
+    """
+    Runs the pipeline `sources` into AmpliFlow with the cached KPI catalog and, when AF_DELTA_SYNC
+    is set, only the changed months. Returns the process exit code.
+
+    Without `af_client` a client is opened from the environment for this run. A long-running process
+    passes its own client, catalog and snapshot store to keep them warm between runs.
+    A `checkpoint` records the progress of the run and is completed once the run succeeded.
+    """
+    from ..exec_client import ExecClient
+    from ..kpi_catalog import KpiCatalog
+    from ..delta import SnapshotStore
+    from ..pipeline import run_pipeline
+
+    if af_client is None:
+        with ExecClient.from_env() as af_client:
+            return run_sources(sources, af_client, catalog, snapshots, checkpoint)
+
+    sink = run_pipeline(af_client, sources, catalog=catalog or KpiCatalog(af_client),
+                        snapshots=snapshots or SnapshotStore.for_client(af_client), checkpoint=checkpoint)
+    code = exit_code(sink)
+    if checkpoint is not None and code == 0:
+        checkpoint.complete()
+    elif checkpoint is not None:
+        log.info('Run again with --resume to continue from the last checkpoint.')
+    return code
+
+
+def open_checkpoint(run_key, resume=False):
+    """
+    Returns the Checkpoint of the run in the local journal, continuing the last run if `resume` is set.
+    """
+    from ..checkpoint import get_journal
+
+    return get_journal().checkpoint(run_key, resume)
+
+
+def exit_code(sink):
+    failed = [result for result in sink.results if result.status not in ('updated', 'unchanged')]
+    for result in sink.results:
+        log.info(f'{result.kpi_name}: {result.status}')
+    return 1 if failed or sink.failed_sources else 0
+
+
+def missing_settings(config, *names):
+    missing = config.require(*names)
+    if missing:
+        log.error(f'Missing required environment variables: {", ".join(missing)}.')
+    return missing
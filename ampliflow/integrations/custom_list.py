@@ -0,0 +1,86 @@
+import logging
+
+from ..exec_client import ExecClient
+from ..custom_lists import find_custom_list_by_name, sync_items, ListSchema
+from ..item_index import ItemIndex
+from . import open_checkpoint, missing_settings
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LIST_NAME = 'GDPR_en_Registry'
+
+
+def main(config, args):
+    if missing_settings(config, 'af_base_url', 'af_api_key'):
+        return 1
+
+    client = ExecClient.from_env()
+    list_name = args.list_name
+
+    # Step 1: Get all custom lists
+    custom_lists = client.get_custom_lists()
+
+    # Step 2: Find the custom list by name
+    custom_list = find_custom_list_by_name(custom_lists, list_name)
+    if not custom_list:
+        log.error(f'Custom list "{list_name}" not found.')
+        return 1
+
+    custom_list_id = custom_list['id']
+
+    # Compile the property schema once, then stamp out a payload per item
+    try:
+        schema = ListSchema.from_custom_list(custom_list)
+    except ValueError as e:
+        log.error(e)
+        return 1
+
+    # Step 3: Prepare properties payloads for two items
+    properties_payload_item1 = schema.payload('Item 1')
+    properties_payload_item2 = schema.payload('Item 2')
+
+    # The steps below are checkpointed, so --resume does not create the two items again
+    checkpoint = open_checkpoint(f'custom-list:{custom_list_id}', args.resume)
+    steps = checkpoint.load('step')
+
+    # Step 4: Create the first item
+    item1_id = steps.get('item1')
+    if item1_id is None:
+        item1_id = client.create_custom_list_item(custom_list_id, properties_payload_item1)
+        checkpoint.record('step', 'item1', item1_id)
+        log.info(f'First item created with ID: {item1_id}')
+
+    # Step 5: Create the second item
+    item2_id = steps.get('item2')
+    if item2_id is None:
+        item2_id = client.create_custom_list_item(custom_list_id, properties_payload_item2)
+        checkpoint.record('step', 'item2', item2_id)
+        log.info(f'Second item created with ID: {item2_id}')
+
+    # Step 6: Update the first item
+    # Let's change the title from "Item 1" to "Updated Item 1"
+    updated_properties_payload = schema.payload('Updated Item 1')
+
+    # Update the item using PATCH
+    if not steps.get('update'):
+        client.update_custom_list_item(item1_id, custom_list_id, updated_properties_payload)
+        checkpoint.record('step', 'update', True)
+
+    # Step 7 (only with --bulk N): Sync N demo items at once, keyed by title.
+    # The local item index remembers the item id and content of every synced title as soon as it is done,
+    # so re-running creates only new titles, updates only changed ones and sends nothing for unchanged ones.
+    failed = []
+    if args.bulk:
+        item_index = ItemIndex.for_client(client)
+        rows = (
+            (title, schema.payload(title))
+            for title in (f'Bulk item {number}' for number in range(1, args.bulk + 1))
+        )
+        failed = sync_items(client, custom_list_id, rows, item_index).failed
+        for key, result in failed:
+            log.error(f'Item "{key}" failed ({result.status_code}): {result.error}')
+    if not failed:
+        checkpoint.complete()
+
+    log.info('Script completed successfully.')
+    return 1 if failed else 0
@@ -0,0 +1,75 @@
+import shlex
+import signal
+import logging
+import functools
+import importlib
+import threading
+
+from ..exec_client import ExecClient
+from ..kpi_catalog import KpiCatalog
+from ..delta import SnapshotStore
+from ..scheduler import Job, Scheduler, parse_interval
+from ..metrics import metrics
+from . import run_sources, missing_settings
+
+log = logging.getLogger(__name__)
+
+SYNC_COMMANDS = ('wint', 'mailerlite', 'ga-visitors', 'ga-conversions')
+
+
+def _run_and_export(run, metrics_path):
+    try:
+        return run()
+    finally:
+        metrics.write(metrics_path)
+
+
+def build_jobs(config, specs, af_client, jitter, metrics_path=None):
+    """
+    Builds a Job per spec such as '1h wint --row Costs=Costs': an interval followed by a sync command
+    and its options. Sources and their API clients are created once and reused by every run.
+    With `metrics_path`, the metrics of the process are written there after every run.
+    """
+    from ..cli import COMMANDS, build_parser
+
+    parser = build_parser()
+    catalog = KpiCatalog(af_client)
+    snapshots = SnapshotStore.for_client(af_client)
+    jobs = []
+    for spec in specs:
+        interval, *argv = shlex.split(spec)
+        if not argv or argv[0] not in SYNC_COMMANDS:
+            log.error(f'Invalid job "{spec}", expected an interval and one of: {", ".join(SYNC_COMMANDS)}.')
+            return None
+        args = parser.parse_args(argv)
+        source = importlib.import_module(COMMANDS[args.command][0]).build_source(config, args)
+        if source is None:
+            return None
+        run = functools.partial(run_sources, [source], af_client, catalog, snapshots)
+        if metrics_path:
+            run = functools.partial(_run_and_export, run, metrics_path)
+        jobs.append(Job(' '.join(argv), parse_interval(interval), run, jitter=jitter))
+    return jobs
+
+
+def main(config, args):
+    if missing_settings(config, 'af_base_url', 'af_api_key'):
+        return 1
+    if not args.job:
+        log.error('No jobs to run, add one or more --job "INTERVAL COMMAND [OPTIONS]".')
+        return 1
+
+    # One AmpliFlow client, KPI catalog and snapshot store for all jobs, kept warm between runs
+    with ExecClient.from_env() as af_client:
+        jobs = build_jobs(config, args.job, af_client, args.jitter, args.metrics)
+        if jobs is None:
+            return 1
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        log.info(f'Scheduling {len(jobs)} jobs: ' + ', '.join(f'{job.name} every {job.interval:g}s' for job in jobs))
+        try:
+            Scheduler(jobs, status_path=args.status_file).run(stop)
+        except KeyboardInterrupt:
+            stop.set()
+    return 0
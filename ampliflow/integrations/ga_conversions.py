@@ -0,0 +1,36 @@
+import logging
+
+from ..ga4 import GaKpi, GaSource
+from ..ga4_cache import MonthCache
+from . import run_sources, open_checkpoint, missing_settings
+
+log = logging.getLogger(__name__)
+
+KPI_NAME = 'Inbound leads - ampliflow.se'
+DEFAULT_CONVERSION_EVENTS = ('page_view', 'scroll', 'session_start')
+
+
+def build_source(config, args):
+    if missing_settings(config, 'ga4_property_id'):
+        return None
+
+    conversion_events = config.conversion_events
+    if not conversion_events:
+        # For testing, hardcode some values
+        conversion_events = DEFAULT_CONVERSION_EVENTS
+        log.info(f'Conversion events not found in environment variable, using default: {conversion_events}')
+
+    # The GA KPIs to keep up to date. Reports for several KPIs are fetched in one batch call.
+    ga_kpis = [
+        GaKpi(args.kpi or KPI_NAME, 'eventCount', filter_values=tuple(conversion_events)),
+    ]
+
+    # Closed months come from the local month cache, only recent months are requested
+    return GaSource({config.ga4_property_id: ga_kpis}, cache=MonthCache())
+
+
+def main(config, args):
+    if missing_settings(config, 'af_base_url', 'af_api_key'):
+        return 1
+    source = build_source(config, args)
+    return run_sources([source], checkpoint=open_checkpoint('ga-conversions', args.resume)) if source else 1
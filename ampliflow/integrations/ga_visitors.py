@@ -0,0 +1,36 @@
+import logging
+
+from ..ga4 import GaKpi, GaSource, parse_properties
+from ..ga4_cache import MonthCache
+from . import run_sources, open_checkpoint, missing_settings
+
+log = logging.getLogger(__name__)
+
+KPI_NAME = 'Total website visitors'
+
+
+def build_source(config, args):
+    # GA4_PROPERTIES maps several properties to their KPIs, e.g. '123456=Visitors - brand A,654321=Visitors - brand B'.
+    # Otherwise the single GA4_PROPERTY_ID feeds the KPI.
+    kpi_names_by_property = parse_properties(config.ga4_properties or config.ga4_property_id, args.kpi or KPI_NAME)
+    if not kpi_names_by_property:
+        log.error('Missing required environment variables: GA4_PROPERTIES or GA4_PROPERTY_ID.')
+        return None
+    log.debug('Properties: %s', kpi_names_by_property)
+
+    # The GA KPIs to keep up to date per property. Reports for several KPIs are fetched in one batch call.
+    ga_kpis_by_property = {
+        property_id: [GaKpi(kpi_name, 'activeUsers')]
+        for property_id, kpi_name in kpi_names_by_property.items()
+    }
+
+    # All properties are fetched concurrently, closed months come from the local month cache.
+    # Then every KPI is updated in one concurrent phase.
+    return GaSource(ga_kpis_by_property, cache=MonthCache())
+
+
+def main(config, args):
+    if missing_settings(config, 'af_base_url', 'af_api_key'):
+        return 1
+    source = build_source(config, args)
+    return run_sources([source], checkpoint=open_checkpoint('ga-visitors', args.resume)) if source else 1
@@ -0,0 +1,31 @@
+import logging
+
+from ..mailerlite import MailerLiteClient, MailerLiteSource
+from . import run_sources, open_checkpoint, missing_settings
+
+log = logging.getLogger(__name__)
+
+KPI_NAME = 'Subscribers'
+
+
+def build_source(config, args, checkpoint=None):
+    if missing_settings(config, 'mailerlite_api_key'):
+        return None
+
+    # Subscriber counts per month of the group
+    client = MailerLiteClient(config.mailerlite_api_key)
+    return MailerLiteSource(client, args.group or config.mailerlite_group_id, args.kpi or KPI_NAME, checkpoint)
+
+
+def main(config, args):
+    if missing_settings(config, 'af_base_url', 'af_api_key'):
+        return 1
+    # Completed pages are checkpointed, so --resume continues a failed run after its last page
+    checkpoint = open_checkpoint(f'mailerlite:{args.group or config.mailerlite_group_id}', args.resume)
+    source = build_source(config, args, checkpoint)
+    if source is None:
+        return 1
+    try:
+        return run_sources([source], checkpoint=checkpoint)
+    finally:
+        source.client.close()
@@ -0,0 +1,43 @@
+import logging
+
+from .. import months
+from ..wint import WintSource, get_client
+from ..wint_cache import ReportCache
+from . import run_sources, open_checkpoint, missing_settings
+
+log = logging.getLogger(__name__)
+
+KPI_NAME = 'Revenue'
+
+
+def parse_row_kpis(entries, default_kpi_name=None):
+    """
+    Parses '--row' entries such as 'Costs=Costs' into {row_id: kpi_name}, defaulting to Revenue.
+    A row without '=' feeds the KPI of the same name.
+    """
+    kpi_names = {}
+    for entry in entries or []:
+        row_id, _, kpi_name = entry.partition('=')
+        if row_id.strip():
+            kpi_names[row_id.strip()] = kpi_name.strip() or row_id.strip()
+    return kpi_names or {'Revenue': default_kpi_name or KPI_NAME}
+
+
+def build_source(config, args):
+    if missing_settings(config, 'wint_username', 'wint_password'):
+        return None
+
+    kpi_names = parse_row_kpis(args.row, args.kpi)
+
+    # The report is fetched once from the start month until the current month and every row is extracted from it.
+    # Long ranges are fetched as concurrent windows, closed windows come from the local report cache.
+    client = get_client(config.wint_username, config.wint_password)
+    return WintSource(client, months.month_key(args.start), kpi_names, months_per_window=args.window,
+                      cache=ReportCache(), refresh=args.refresh)
+
+
+def main(config, args):
+    if missing_settings(config, 'af_base_url', 'af_api_key'):
+        return 1
+    source = build_source(config, args)
+    return run_sources([source], checkpoint=open_checkpoint('wint', args.resume)) if source else 1
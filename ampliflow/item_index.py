@@ -0,0 +1,68 @@
+import json
+import sqlite3
+import hashlib
+from pathlib import Path
+
+from .kpi_catalog import default_cache_path
+
+
+def content_hash(properties_payload):
+    encoded = json.dumps(properties_payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+class ItemIndex:
+    """
+    Local SQLite index from a natural key (such as the item title) to the AmpliFlow item id
+    and a hash of the properties last sent, per custom list.
+    """
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS items ('
+            ' custom_list_id TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' item_id TEXT NOT NULL,'
+            ' content_hash TEXT NOT NULL,'
+            ' PRIMARY KEY (custom_list_id, key))'
+        )
+        self.connection.commit()
+
+    @classmethod
+    def for_client(cls, client):
+        return cls(default_cache_path(client, 'items', '.sqlite'))
+
+    def close(self):
+        self.connection.close()
+
+    def load(self, custom_list_id):
+        """
+        Returns {key: (item_id, content_hash)} for every indexed item of the custom list.
+        """
+        rows = self.connection.execute(
+            'SELECT key, item_id, content_hash FROM items WHERE custom_list_id = ?', (str(custom_list_id),))
+        return {key: (json.loads(item_id), item_hash) for key, item_id, item_hash in rows}
+
+    def put_many(self, custom_list_id, entries):
+        """
+        Stores (key, item_id, content_hash) entries for the custom list.
+        """
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO items (custom_list_id, key, item_id, content_hash) VALUES (?, ?, ?, ?)',
+                [(str(custom_list_id), key, json.dumps(item_id), item_hash) for key, item_id, item_hash in entries])
+
+    def delete_many(self, custom_list_id, keys):
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM items WHERE custom_list_id = ? AND key = ?',
+                [(str(custom_list_id), key) for key in keys])
+
+    def clear(self, custom_list_id=None):
+        with self.connection:
+            if custom_list_id is None:
+                self.connection.execute('DELETE FROM items')
+            else:
+                self.connection.execute('DELETE FROM items WHERE custom_list_id = ?', (str(custom_list_id),))
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from .transport import ApiError
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'ampliflow'
+
+
+def cache_dir():
+    return Path(os.environ.get('AF_CACHE_DIR', DEFAULT_CACHE_DIR))
+
+
+def default_cache_path(client, name='kpis', suffix='.json'):
+    """
+    Returns the `name` cache file for the tenant and API key of `client`. The key itself is
+    hashed so it never ends up in a file name. AF_CACHE_DIR overrides the directory.
+    """
+    tenant = hashlib.sha256(f'{client.base_url}|{client.api_key}'.encode()).hexdigest()[:16]
+    return cache_dir() / f'{name}-{tenant}{suffix}'
+
+
+class KpiCatalog:
+    """
+    Cached KPI catalog with O(1) lookups by name and by id.
+
+    The catalog is persisted to `cache_path` unless `persist` is False, and is considered
+    fresh for `ttl` seconds. After that it is revalidated with If-None-Match/If-Modified-Since,
+    so an unchanged catalog costs a 304 instead of a full download. When the revalidation fails,
+    the cached catalog is used for another `ttl` seconds by this instance.
+    """
+
+    def __init__(self, client, cache_path=None, ttl=None, persist=True):
+        self.client = client
+        if not persist:
+            self.cache_path = None
+        else:
+            self.cache_path = cache_path or default_cache_path(client)
+        self.ttl = ttl if ttl is not None else float(os.environ.get('AF_KPI_CACHE_TTL', DEFAULT_TTL))
+
+        self._lock = threading.Lock()
+        self._created_at = time.time()
+        self._fetched_at = 0.0
+        self._etag = None
+        self._last_modified = None
+        self._kpis = None
+        self._by_name = {}
+        self._by_id = {}
+        self._load()
+
+    @property
+    def kpis(self):
+        self.refresh()
+        return self._kpis
+
+    def find_by_name(self, name):
+        self.refresh()
+        kpi = self._by_name.get(name)
+        if kpi is None and self._fetched_at < self._created_at:
+            # The cached catalog predates this process and may miss a newly created KPI
+            self.refresh(force=True)
+            kpi = self._by_name.get(name)
+        if kpi:
+            log.info(f'FOUND: KPI "{name}"')
+        return kpi
+
+    def find_by_id(self, kpi_id):
+        self.refresh()
+        return self._by_id.get(kpi_id)
+
+    def is_fresh(self):
+        return self._kpis is not None and time.time() - self._fetched_at < self.ttl
+
+    def refresh(self, force=False):
+        """
+        Revalidates the catalog if it is stale, or right away if `force` is True.
+        """
+        with self._lock:
+            if not force and self.is_fresh():
+                return
+
+            if self._kpis is None:
+                kpis, etag, last_modified = self.client.get_kpis_conditional()
+            else:
+                try:
+                    kpis, etag, last_modified = self.client.get_kpis_conditional(self._etag, self._last_modified)
+                except ApiError as e:
+                    log.warning(f'Could not revalidate the KPI catalog, using the cached one: {e}')
+                    # Only in memory, so the next process revalidates again, but this one does not
+                    # retry on every lookup
+                    self._fetched_at = time.time()
+                    return
+
+            if kpis is not None:
+                self._set(kpis)
+            self._etag = etag
+            self._last_modified = last_modified
+            self._fetched_at = time.time()
+            self._save()
+
+    def invalidate(self):
+        """
+        Drops the in-memory and on-disk catalog so the next lookup downloads it again.
+        """
+        with self._lock:
+            self._kpis = None
+            self._by_name = {}
+            self._by_id = {}
+            self._etag = None
+            self._last_modified = None
+            self._fetched_at = 0.0
+            if self.cache_path is not None:
+                Path(self.cache_path).unlink(missing_ok=True)
+
+    def _set(self, kpis):
+        self._kpis = kpis
+        self._by_name = {}
+        self._by_id = {}
+        for kpi in kpis:
+            # Keep the first KPI for a duplicated name, like the linear scan did
+            self._by_name.setdefault(kpi.get('name'), kpi)
+            self._by_id[kpi.get('id')] = kpi
+
+    def _load(self):
+        if self.cache_path is None or not Path(self.cache_path).exists():
+            return
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning(f'Ignoring unreadable KPI cache {self.cache_path}: {e}')
+            return
+
+        self._set(cached['kpis'])
+        self._etag = cached.get('etag')
+        self._last_modified = cached.get('last_modified')
+        self._fetched_at = cached.get('fetched_at', 0.0)
+
+    def _save(self):
+        if self.cache_path is None:
+            return
+        path = Path(self.cache_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fetched_at': self._fetched_at,
+                'etag': self._etag,
+                'last_modified': self._last_modified,
+                'kpis': self._kpis,
+            }, f)
+        os.replace(tmp_path, path)
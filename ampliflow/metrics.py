@@ -0,0 +1,196 @@
+"""
+In-process metrics for the integrations: latency histograms, bytes and retries per HTTP endpoint,
+and durations per sync phase. Export them with to_prometheus(), to_json() or write().
+"""
+import re
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Upper bounds in seconds, as for Prometheus histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Path segments that look like ids, replaced so endpoints group together
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F-]{16,}|[A-Za-z0-9_-]{24,})$')
+
+
+def endpoint_name(method, url, secret=None):
+    """
+    Returns 'METHOD host/path' with ids in the path replaced by ':id' and the path segment that
+    equals `secret`, such as the Exec API key, replaced by ':key'.
+    """
+    parts = urlsplit(url)
+    path = '/'.join(
+        ':key' if secret and segment == secret else ':id' if _ID_SEGMENT.match(segment) else segment
+        for segment in parts.path.split('/')
+    )
+    return f'{method} {parts.netloc}{path}'
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': {('+Inf' if bound == float('inf') else f'{bound:g}'): total for bound, total in self.cumulative()},
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.errors = 0
+
+    def to_dict(self):
+        return {
+            'latency_seconds': self.latency.to_dict(),
+            'statuses': dict(self.statuses),
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'retries': self.retries,
+            'errors': self.errors,
+        }
+
+
+class Metrics:
+    """
+    Thread-safe registry of the request and phase metrics of this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.endpoints = {}
+        self.phases = {}
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+            self.phases = {}
+
+    def _endpoint(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record_request(self, endpoint, seconds, status_code=None, bytes_in=0, bytes_out=0):
+        """
+        Records one HTTP attempt. A status_code of None counts as a connection error.
+        """
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.latency.observe(seconds)
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            if status_code is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+
+    def record_retry(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint).retries += 1
+
+    def record_phase(self, name, seconds):
+        with self._lock:
+            histogram = self.phases.get(name)
+            if histogram is None:
+                histogram = self.phases[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the block as one run of the phase `name`, such as 'fetch', 'aggregate', 'resolve' or 'push'.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.perf_counter() - started)
+
+    def to_json(self):
+        with self._lock:
+            return {
+                'endpoints': {endpoint: stats.to_dict() for endpoint, stats in sorted(self.endpoints.items())},
+                'phases': {name: histogram.to_dict() for name, histogram in sorted(self.phases.items())},
+            }
+
+    def to_prometheus(self):
+        lines = []
+
+        def histogram_lines(metric, labels, histogram):
+            for bound, total in histogram.cumulative():
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {total}')
+            lines.append(f'{metric}_sum{{{labels}}} {histogram.sum:.6f}')
+            lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+
+        with self._lock:
+            lines.append('# TYPE ampliflow_http_request_duration_seconds histogram')
+            for endpoint, stats in sorted(self.endpoints.items()):
+                histogram_lines('ampliflow_http_request_duration_seconds', f'endpoint="{endpoint}"', stats.latency)
+            for metric, attribute in (('ampliflow_http_received_bytes_total', 'bytes_in'),
+                                      ('ampliflow_http_sent_bytes_total', 'bytes_out'),
+                                      ('ampliflow_http_retries_total', 'retries'),
+                                      ('ampliflow_http_connection_errors_total', 'errors')):
+                lines.append(f'# TYPE {metric} counter')
+                for endpoint, stats in sorted(self.endpoints.items()):
+                    lines.append(f'{metric}{{endpoint="{endpoint}"}} {getattr(stats, attribute)}')
+            lines.append('# TYPE ampliflow_http_responses_total counter')
+            for endpoint, stats in sorted(self.endpoints.items()):
+                for status_code, count in sorted(stats.statuses.items()):
+                    lines.append(f'ampliflow_http_responses_total{{endpoint="{endpoint}",status="{status_code}"}} {count}')
+            lines.append('# TYPE ampliflow_phase_duration_seconds histogram')
+            for name, histogram in sorted(self.phases.items()):
+                histogram_lines('ampliflow_phase_duration_seconds', f'phase="{name}"', histogram)
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """
+        Writes the metrics to `path`, as JSON if it ends in .json and as Prometheus text otherwise.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == '.json':
+            text = json.dumps(self.to_json(), indent=2)
+        else:
+            text = self.to_prometheus()
+        with self._write_lock:
+            tmp_path = path.with_suffix(path.suffix + '.tmp')
+            tmp_path.write_text(text, encoding='utf-8')
+            tmp_path.replace(path)
+
+
+# The metrics of this process
+metrics = Metrics()
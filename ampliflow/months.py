@@ -0,0 +1,87 @@
+import collections
+from datetime import date, timedelta
+
+
+def month_key(timestamp):
+    """
+    Returns (year, month) of a timestamp that starts with 'YYYY-MM', such as '2024-04-01 12:00:00'
+    or '2024-04-01T00:00:00.000Z', without parsing the full datetime.
+    """
+    return int(timestamp[:4]), int(timestamp[5:7])
+
+
+def iter_months(start, end):
+    """
+    Yields every (year, month) from `start` to `end`, both (year, month) and inclusive.
+    """
+    year, month = start
+    while (year, month) <= end:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def is_closed(year, month, late_days, today=None):
+    """
+    A month is closed once it has ended and `late_days` more days have passed, so its numbers are
+    no longer expected to change.
+    """
+    today = today or date.today()
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return today >= next_month + timedelta(days=late_days)
+
+
+def count_by_month(timestamps, counts=None):
+    """
+    Counts timestamps per month. Returns a Counter keyed by the 'YYYY-MM' prefix, updated in place
+    when `counts` is given, so it can be fed page by page. Use month_totals() to get
+    (year, month) keys; the prefixes are only converted once per distinct month.
+    """
+    if counts is None:
+        counts = collections.Counter()
+    counts.update(timestamp[:7] for timestamp in timestamps)
+    return counts
+
+
+def sum_by_month(entries, totals=None):
+    """
+    Sums (timestamp, value) pairs per month, keyed like count_by_month().
+    """
+    if totals is None:
+        totals = collections.Counter()
+    for timestamp, value in entries:
+        totals[timestamp[:7]] += value
+    return totals
+
+
+def month_totals(prefix_counts):
+    """
+    Converts a {'YYYY-MM': value} mapping into {(year, month): value}.
+    """
+    return {month_key(prefix): value for prefix, value in prefix_counts.items()}
+
+
+def count_by_month_numpy(timestamps):
+    """
+    Counts timestamps per month with NumPy datetime64[M]. Returns {(year, month): count}.
+    Worth it when the timestamps already are a NumPy array; for a Python list,
+    count_by_month() is faster. Requires numpy.
+    """
+    import numpy as np
+
+    months = np.asarray(timestamps, dtype='U7').astype('datetime64[M]')
+    unique, counts = np.unique(months, return_counts=True)
+    month_numbers = unique.astype('int64')  # Months since 1970-01
+    return {
+        (int(number // 12 + 1970), int(number % 12 + 1)): int(count)
+        for number, count in zip(month_numbers, counts)
+    }
+
+
+def to_values(totals):
+    """
+    Converts {(year, month): value} into the Exec API values format, sorted by month.
+    """
+    return [
+        {'year': year, 'month': month, 'value': value}
+        for (year, month), value in sorted(totals.items())
+    ]
@@ -0,0 +1,130 @@
+"""
+Source → KPI pipeline.
+
+A source fetches data from an external system and yields KpiStreams, (year, month, value) points per
+AmpliFlow KPI, preferably as a MonthlySeries. A KpiSink collects the streams of any number of sources,
+deduplicates the months and pushes every KPI in one concurrent run_sync() phase with delta detection. Sources do not own their
+API clients, so one process can run many syncs over shared, warm connection pools and caches.
+"""
+import logging
+from typing import Iterable, NamedTuple
+
+from .async_sync import DEFAULT_CONCURRENCY, run_sync
+from .metrics import metrics
+from .series import MonthlySeries
+from .transport import ApiError
+
+log = logging.getLogger(__name__)
+
+class SourceError(Exception):
+    """
+    Raised by a source that could not fetch its data.
+    """
+
+
+class KpiStream(NamedTuple):
+    kpi_name: str
+    points: Iterable  # (year, month, value), or a MonthlySeries
+
+
+class Source:
+    """
+    Base class of pipeline sources. Subclasses implement streams().
+    """
+    name = None
+
+    def streams(self):
+        """
+        Yields a KpiStream per KPI fed by the source.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.name!r})'
+
+
+class KpiSink:
+    """
+    Collects KPI streams and pushes them to AmpliFlow with run_sync().
+
+    Points are deduplicated per KPI and month; a later value for a month replaces an earlier one.
+    Pending KPIs are pushed concurrently by flush(), which also runs once `batch_size` KPIs are
+    pending. `catalog`, `delta`, `snapshots` and `checkpoint` are passed on to run_sync().
+    """
+
+    def __init__(self, client, catalog=None, delta=None, snapshots=None, concurrency=DEFAULT_CONCURRENCY,
+                 batch_size=None, checkpoint=None):
+        self.client = client
+        self.catalog = catalog
+        self.delta = delta
+        self.snapshots = snapshots
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.results = []
+        self.failed_sources = []
+        self._pending = {}
+
+    def add(self, kpi_name, points):
+        with metrics.phase('aggregate'):
+            series = points if isinstance(points, MonthlySeries) else MonthlySeries.from_points(points)
+            pending = self._pending.get(kpi_name)
+            conflicts = len(series.diff(pending, missing=False)) if pending is not None else 0
+            series = pending.merge(series) if pending is not None else series
+        if not series:
+            log.warning(f'No data for KPI "{kpi_name}".')
+            self._pending.pop(kpi_name, None)
+            return
+        self._pending[kpi_name] = series
+        if conflicts:
+            log.warning(f'{conflicts} months of KPI "{kpi_name}" were sent more than once, keeping the last values.')
+        if self.batch_size and len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def consume(self, source):
+        """
+        Adds every stream of `source`. A source that fails (SourceError or ApiError) is logged and recorded in `failed_sources`,
+        so the other sources of a run are still pushed.
+        """
+        count = 0
+        try:
+            # The sources time their own fetch and aggregate phases, add() times the merge
+            for stream in source.streams():
+                self.add(*stream)
+                count += 1
+        except (SourceError, ApiError) as error:
+            log.error(f'{source!r} failed: {error}')
+            self.failed_sources.append(source)
+            return False
+        log.info(f'{source!r} fed {count} KPIs.')
+        return True
+
+    def flush(self):
+        """
+        Pushes every pending KPI and returns their SyncResults.
+        """
+        if not self._pending:
+            return []
+        with metrics.phase('aggregate'):
+            jobs = [(kpi_name, series.to_values()) for kpi_name, series in self._pending.items()]
+        self._pending = {}
+        if log.isEnabledFor(logging.DEBUG):
+            for kpi_name, values in jobs:
+                log.debug('Values of KPI "%s": %s', kpi_name, values)
+        results = run_sync(self.client, jobs, concurrency=self.concurrency, catalog=self.catalog,
+                           delta=self.delta, snapshots=self.snapshots, checkpoint=self.checkpoint)
+        self.results.extend(results)
+        return results
+
+
+def run_pipeline(client, sources, **sink_kwargs):
+    """
+    Feeds the streams of all `sources` into one KpiSink and pushes them. Returns the sink, with the
+    SyncResults in `results` and the sources that failed in `failed_sources`.
+    Extra keyword arguments are passed on to KpiSink.
+    """
+    sink = KpiSink(client, **sink_kwargs)
+    for source in sources:
+        sink.consume(source)
+    sink.flush()
+    return sink
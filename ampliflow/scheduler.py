@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_interval(value):
+    """
+    Parses an interval such as '90s', '15m', '1h', '1d' or a plain number of seconds.
+    """
+    value = value.strip().lower()
+    if value[-1:] in UNITS:
+        return float(value[:-1]) * UNITS[value[-1]]
+    return float(value)
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    coalesced: int = 0
+    running: bool = False
+    last_status: str = None
+    last_started: str = None
+    last_duration: float = None
+
+
+@dataclass
+class Job:
+    """
+    A function run every `interval` seconds. `run` returns an exit code, where 0 means success.
+    Each run is moved by up to `jitter` (a fraction of the interval) so jobs do not fire in step.
+    """
+    name: str
+    interval: float
+    run: Callable
+    jitter: float = 0.1
+    next_run: float = 0.0
+    stats: JobStats = field(default_factory=JobStats)
+
+    def schedule(self, now, first=False):
+        spread = random.uniform(0, self.jitter * self.interval)
+        self.next_run = now + spread if first else now + self.interval + spread
+
+
+class Scheduler:
+    """
+    Runs jobs on their own intervals in one process, on a thread pool with a worker per job.
+
+    A job that is still running when it is due again is not started twice; the run is skipped
+    and counted as coalesced. After every run the stats of all jobs are logged and, with
+    `status_path`, written there as JSON.
+    """
+
+    def __init__(self, jobs, status_path=None):
+        self.jobs = list(jobs)
+        self.status_path = Path(status_path) if status_path else None
+        self._lock = threading.Lock()
+
+    def status(self):
+        with self._lock:
+            return {job.name: asdict(job.stats) for job in self.jobs}
+
+    def _execute(self, job):
+        started = time.perf_counter()
+        job.stats.last_started = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        try:
+            status = 'ok' if not job.run() else 'failed'
+        except Exception:
+            log.exception(f'Job {job.name} raised an error.')
+            status = 'error'
+
+        duration = time.perf_counter() - started
+        with self._lock:
+            stats = job.stats
+            stats.runs += 1
+            stats.failures += status != 'ok'
+            stats.running = False
+            stats.last_status = status
+            stats.last_duration = round(duration, 3)
+        log.info(f'Job {job.name}: {status} in {duration:.2f}s ({stats.runs} runs, {stats.failures} failed, '
+                 f'{stats.coalesced} coalesced).')
+        self._write_status()
+
+    def _write_status(self):
+        if self.status_path is None:
+            return
+        status = self.status()
+        with self._lock:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.status_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(status, f, indent=2)
+            os.replace(tmp_path, self.status_path)
+
+    def run(self, stop=None):
+        """
+        Runs the jobs until `stop` (a threading.Event) is set. Running jobs are finished before returning.
+        """
+        stop = stop or threading.Event()
+        now = time.monotonic()
+        for job in self.jobs:
+            job.schedule(now, first=True)
+
+        with ThreadPoolExecutor(max_workers=max(len(self.jobs), 1)) as executor:
+            while not stop.is_set():
+                now = time.monotonic()
+                for job in self.jobs:
+                    if job.next_run > now:
+                        continue
+                    with self._lock:
+                        if job.stats.running:
+                            job.stats.coalesced += 1
+                            log.info(f'Job {job.name} is still running, skipping this run.')
+                        else:
+                            job.stats.running = True
+                            executor.submit(self._execute, job)
+                    job.schedule(now)
+                stop.wait(max(min(job.next_run for job in self.jobs) - time.monotonic(), 0))
+            log.info('Scheduler stopping, waiting for running jobs.')
@@ -0,0 +1,211 @@
+"""
+Columnar monthly time series.
+
+A MonthlySeries keeps a KPI's months and values in two array.array columns instead of a list of
+{'year', 'month', 'value'} dicts: a packed month index (year * 12 + month - 1), sorted and unique,
+and the values, as 64-bit integers while every value is an int and as doubles otherwise.
+It iterates as (year, month, value) points, so it can be passed anywhere points are expected,
+and converts to the Exec API values format with to_values() where a payload is built.
+"""
+import operator
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .months import month_key
+
+INT = 'q'
+FLOAT = 'd'
+
+
+def month_index(year, month):
+    return year * 12 + month - 1
+
+
+def _output(value):
+    # Whole doubles are sent as ints, like parse_metric() does for GA4
+    return int(value) if value.is_integer() else value
+
+
+class MonthlySeries:
+    """
+    Values per month, sorted by month with one value per month. Instances are not modified by
+    any operation; merge(), diff() and resample() return new series.
+    """
+
+    __slots__ = ('index', 'values')
+
+    def __init__(self, index=None, values=None):
+        self.index = index if index is not None else array(INT)
+        self.values = values if values is not None else array(INT)
+
+    @classmethod
+    def _build(cls, indexes, values):
+        try:
+            values = array(INT, values)
+        except (TypeError, OverflowError):
+            values = array(FLOAT, values)
+        return cls(array(INT, indexes), values)
+
+    @classmethod
+    def from_points(cls, points):
+        """
+        Builds a series from (year, month, value) points in any order. A later point for a month
+        replaces an earlier one.
+        """
+        points = points if isinstance(points, list) else list(points)
+        indexes = [year * 12 + month - 1 for year, month, _ in points]
+        values = [value for _, _, value in points]
+        if not all(map(operator.lt, indexes, indexes[1:])):
+            by_index = dict(zip(indexes, values))
+            indexes = sorted(by_index)
+            values = [by_index[key] for key in indexes]
+        return cls._build(indexes, values)
+
+    @classmethod
+    def from_totals(cls, totals):
+        """
+        Builds a series from {(year, month): value}.
+        """
+        return cls.from_points((year, month, value) for (year, month), value in totals.items())
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        Builds a series from Exec API values, [{'year': ..., 'month': ..., 'value': ...}].
+        """
+        return cls.from_points((entry['year'], entry['month'], entry['value']) for entry in values)
+
+    @classmethod
+    def from_dated(cls, entries):
+        """
+        Builds a series from [{'date': 'YYYY-MM...', 'value': ...}] entries, such as Wint rows.
+        """
+        return cls.from_points((*month_key(entry['date']), entry['value']) for entry in entries)
+
+    @classmethod
+    def from_range(cls, start_year, start_month, values):
+        """
+        Builds a series of consecutive months from (start_year, start_month) on, one per value.
+        """
+        values = list(values)
+        first = month_index(start_year, start_month)
+        return cls._build(range(first, first + len(values)), values)
+
+    @classmethod
+    def from_numpy(cls, months, values):
+        """
+        Builds a series from a NumPy datetime64[M] array of months (sorted and unique) and the
+        matching values. Requires numpy.
+        """
+        import numpy as np
+
+        index = array(INT, (np.asarray(months, dtype='datetime64[M]').astype('int64') + 1970 * 12).tobytes())
+        values = np.asarray(values)
+        if values.dtype.kind in 'iub':
+            return cls(index, array(INT, values.astype('int64').tobytes()))
+        return cls(index, array(FLOAT, values.astype('float64').tobytes()))
+
+    def to_numpy(self):
+        """
+        Returns (months as datetime64[M], values) NumPy arrays. The values share the memory of the
+        series, so do not modify them. Requires numpy.
+        """
+        import numpy as np
+
+        months = (np.frombuffer(self.index, dtype='int64') - 1970 * 12).astype('datetime64[M]')
+        values = np.frombuffer(self.values, dtype='int64' if self.values.typecode == INT else 'float64')
+        return months, values
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        for key, value in zip(self.index, self.values):
+            yield key // 12, key % 12 + 1, value
+
+    def __eq__(self, other):
+        if not isinstance(other, MonthlySeries):
+            return NotImplemented
+        return self.index == other.index and list(self.values) == list(other.values)
+
+    def __repr__(self):
+        if not self.index:
+            return 'MonthlySeries([])'
+        first, last = self.index[0], self.index[-1]
+        return (f'MonthlySeries({len(self)} months, {first // 12}-{first % 12 + 1:02d}'
+                f'..{last // 12}-{last % 12 + 1:02d})')
+
+    def get(self, year, month, default=None):
+        key = month_index(year, month)
+        position = bisect_left(self.index, key)
+        if position < len(self.index) and self.index[position] == key:
+            return self.values[position]
+        return default
+
+    def merge(self, other):
+        """
+        Returns the months of both series. Where both have a month, the value of `other` wins.
+        """
+        if not other.index:
+            return self
+        if not self.index or self.index[-1] < other.index[0]:
+            return self._build(self.index + other.index, self.values.tolist() + other.values.tolist())
+        by_index = dict(zip(self.index, self.values))
+        by_index.update(zip(other.index, other.values))
+        indexes = sorted(by_index)
+        return self._build(indexes, [by_index[key] for key in indexes])
+
+    def diff(self, other, missing=True):
+        """
+        Returns the months of this series whose value differs in `other`, and with `missing` also
+        those `other` does not have. Like delta.diff_values(), for finding the months to send.
+        """
+        old = dict(zip(other.index, other.values))
+        changed = [
+            (key, value) for key, value in zip(self.index, self.values)
+            if (old[key] != value if key in old else missing)
+        ]
+        return self._build([key for key, _ in changed], [value for _, value in changed])
+
+    def resample(self, months_per_bucket, how='sum'):
+        """
+        Aggregates the series into calendar-aligned buckets of `months_per_bucket` months, 3 for
+        quarters and 12 for years, keyed by their first month. `how` is 'sum', 'last' or 'mean'.
+        """
+        if how not in ('sum', 'last', 'mean'):
+            raise ValueError(f'Unknown aggregation "{how}", expected sum, last or mean.')
+        indexes = []
+        values = []
+        counts = []
+        for key, value in zip(self.index, self.values):
+            bucket = key - key % months_per_bucket
+            if indexes and indexes[-1] == bucket:
+                values[-1] = value if how == 'last' else values[-1] + value
+                counts[-1] += 1
+            else:
+                indexes.append(bucket)
+                values.append(value)
+                counts.append(1)
+        if how == 'mean':
+            values = [value / count for value, count in zip(values, counts)]
+        return self._build(indexes, values)
+
+    def sum(self, start=None, end=None):
+        """
+        Returns the total of the months from `start` to `end`, both (year, month) and inclusive,
+        or of the whole series.
+        """
+        low = bisect_left(self.index, month_index(*start)) if start else 0
+        high = bisect_right(self.index, month_index(*end)) if end else len(self.index)
+        return sum(self.values[low:high])
+
+    def to_totals(self):
+        return {(year, month): value for year, month, value in self}
+
+    def to_values(self):
+        """
+        Returns the series in the Exec API values format, [{'year': ..., 'month': ..., 'value': ...}].
+        """
+        if self.values.typecode == INT:
+            return [{'year': year, 'month': month, 'value': value} for year, month, value in self]
+        return [{'year': year, 'month': month, 'value': _output(value)} for year, month, value in self]
@@ -0,0 +1,264 @@
+"""
+Shared HTTP transport: a requests.Session that retries transient failures with exponential backoff
+and jitter, honors Retry-After and rate limit headers, and paces requests per host with a token
+bucket. API errors are raised as typed exceptions instead of ending the process.
+"""
+import os
+import json
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from .metrics import metrics, endpoint_name
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF = 0.5  # Seconds before the first retry, doubled per attempt
+DEFAULT_BACKOFF_CAP = 30.0
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+# Statuses that mean the request was not processed, so even non-idempotent requests can be retried
+UNPROCESSED_STATUSES = frozenset((429, 503))
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'PATCH'))
+
+
+class ApiError(Exception):
+    """
+    An API request that failed, after any retries.
+    """
+
+    def __init__(self, message, status_code=None, response_text=None, url=None):
+        super().__init__(f'{message} ({status_code})' if status_code else message)
+        self.status_code = status_code
+        self.response_text = response_text
+        self.url = url
+
+
+class ClientError(ApiError):
+    """
+    The API rejected the request (4xx), so retrying it will not help.
+    """
+
+
+class RateLimitError(ApiError):
+    """
+    The API kept answering 429 Too Many Requests.
+    """
+
+
+class ServerError(ApiError):
+    """
+    The API kept failing with a server error (5xx).
+    """
+
+
+class TransportError(ApiError):
+    """
+    The API could not be reached: connection errors or timeouts.
+    """
+
+
+def raise_for_status(response, message, expected=(200,)):
+    """
+    Raises the typed ApiError for `response` unless its status is one of `expected`.
+    """
+    status_code = response.status_code
+    if status_code in expected:
+        return
+    if status_code == 429:
+        error_class = RateLimitError
+    elif status_code >= 500:
+        error_class = ServerError
+    else:
+        error_class = ClientError
+    log.debug('Response: %s', response.text)
+    raise error_class(message, status_code, response.text, response.url)
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average with bursts of up to `capacity`. acquire() blocks
+    until a token is available; pause() holds every caller back, for example until a rate limit resets.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(host, rate):
+    """
+    Returns the process-wide TokenBucket of `host`, so every session talking to it shares its limit.
+    """
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(rate)
+        return _buckets[host]
+
+
+def retry_after(response):
+    """
+    Returns the seconds to wait from a Retry-After header (seconds or an HTTP date), or None.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limit_reset(response):
+    """
+    Returns the seconds until the rate limit resets when X-RateLimit-Remaining says it is used up,
+    as sent by MailerLite, or None. X-RateLimit-Reset may be seconds or an epoch timestamp.
+    """
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    reset = response.headers.get('X-RateLimit-Reset')
+    if remaining is None or reset is None:
+        return None
+    try:
+        if int(remaining) > 0:
+            return None
+        reset = float(reset)
+    except ValueError:
+        return None
+    return max(reset - time.time(), 0.0) if reset > 1e9 else reset
+
+
+class Session(requests.Session):
+    """
+    A requests.Session that retries transient failures.
+
+    Connection errors, timeouts and the statuses in RETRY_STATUSES are retried up to `max_retries`
+    times with exponential backoff and full jitter, or after the time a Retry-After header asks for.
+    Non-idempotent requests (POST) are only retried when the server did not process them
+    (429, 503, or a connect that was refused or timed out), unless `retry_posts` is set. With a `rate`, requests per
+    second to each host are limited by a shared TokenBucket, which rate limit headers pause.
+
+    When the retries are used up, the last response is returned for the caller to check with
+    raise_for_status(), and connection errors are raised as TransportError.
+
+    Every attempt is recorded in metrics.metrics under `endpoint`, by default endpoint_name() of the
+    URL; pass one with secrets masked when the URL contains any. Request and response bodies are
+    only logged at DEBUG level.
+    """
+
+    def __init__(self, max_retries=None, backoff=DEFAULT_BACKOFF, backoff_cap=DEFAULT_BACKOFF_CAP,
+                 rate=None, retry_posts=False):
+        super().__init__()
+        if max_retries is None:
+            max_retries = int(os.environ.get('AF_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.rate = rate
+        self.retry_posts = retry_posts
+
+    def _delay(self, attempt):
+        return random.uniform(0, min(self.backoff_cap, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, *args, endpoint=None, **kwargs):
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS or self.retry_posts
+        bucket = get_bucket(urlsplit(url).netloc, self.rate) if self.rate else None
+        endpoint = endpoint or endpoint_name(method, url)
+        if log.isEnabledFor(logging.DEBUG) and kwargs.get('json') is not None:
+            log.debug('%s payload: %s', endpoint, json.dumps(kwargs['json']))
+
+        attempt = 0
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            started = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.record_request(endpoint, time.perf_counter() - started)
+                retryable = idempotent or _not_sent(e)
+                # Only the endpoint name is logged, the URL and str(e) may contain an API key
+                if not retryable or attempt >= self.max_retries:
+                    raise TransportError(f'{endpoint} failed ({type(e).__name__})') from e
+                delay = self._delay(attempt)
+                log.warning(f'{endpoint} failed ({type(e).__name__}), retrying in {delay:.1f}s.')
+            else:
+                metrics.record_request(endpoint, time.perf_counter() - started, response.status_code,
+                                       _received_bytes(response), _body_size(response.request.body))
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug('%s answered %s: %s', endpoint, response.status_code, response.text)
+                reset = rate_limit_reset(response)
+                if reset and bucket is not None:
+                    bucket.pause(reset)
+
+                status_code = response.status_code
+                retryable = status_code in (RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES)
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                delay = max(retry_after(response) or reset or 0.0, self._delay(attempt))
+                if status_code == 429 and bucket is not None:
+                    bucket.pause(delay)
+                log.warning(f'{endpoint} answered {status_code}, retrying in {delay:.1f}s.')
+                response.close()
+
+            attempt += 1
+            metrics.record_retry(endpoint)
+            time.sleep(delay)
+
+
+def _not_sent(error):
+    """
+    True if `error` happened before the request reached the server: a connect that timed out, was
+    refused or could not resolve the host. Anything later may have been processed.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    return len(body.encode() if isinstance(body, str) else body)
+
+
+def _received_bytes(response):
+    # The size on the wire, so compressed for gzip responses
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else len(response.content)
@@ -0,0 +1,306 @@
+import os
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+
+from .metrics import metrics
+from .months import iter_months
+from .pipeline import Source, KpiStream, SourceError
+from .series import MonthlySeries
+from .transport import ApiError, Session, raise_for_status
+from .wint_cache import account_key, is_window_closed
+
+log = logging.getLogger(__name__)
+
+WINT_BASE_URL = 'https://superkollapi.wint.se'
+DEFAULT_WINDOW_MONTHS = 12  # Months per report request, aligned to calendar years
+DEFAULT_MAX_WORKERS = 4  # Windows fetched concurrently
+DEFAULT_POOL_SIZE = DEFAULT_MAX_WORKERS
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 120  # Result reports over long ranges are slow
+
+
+class WintClient:
+    """
+    Client for the Wint financial reports API.
+
+    All report calls go through one keep-alive requests.Session authenticated with the Wint
+    credentials, so several reports, windows and KPIs in one process share its TLS connections.
+    Any session cookie the API issues is kept by the session and sent with the following calls.
+    Reports are read-only, so failed report POSTs are retried like reads (see transport.Session).
+    """
+
+    def __init__(self, username, password, base_url=WINT_BASE_URL, pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=None, rate=None):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+
+        self.session = Session(max_retries=max_retries, rate=rate, retry_posts=True)
+        self.session.auth = (username, password)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    @classmethod
+    def from_env(cls, username=None, password=None, **kwargs):
+        """
+        Creates a client from WINT_USERNAME and WINT_PASSWORD unless credentials are given. Base URL,
+        pool size, timeouts and the request rate can be overridden with WINT_BASE_URL, WINT_POOL_SIZE,
+        WINT_CONNECT_TIMEOUT, WINT_READ_TIMEOUT and WINT_RATE_LIMIT (requests per second).
+        """
+        kwargs.setdefault('base_url', os.environ.get('WINT_BASE_URL', WINT_BASE_URL))
+        kwargs.setdefault('pool_size', int(os.environ.get('WINT_POOL_SIZE', DEFAULT_POOL_SIZE)))
+        kwargs.setdefault('connect_timeout', float(os.environ.get('WINT_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)))
+        kwargs.setdefault('read_timeout', float(os.environ.get('WINT_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)))
+        if os.environ.get('WINT_RATE_LIMIT'):
+            kwargs.setdefault('rate', float(os.environ['WINT_RATE_LIMIT']))
+        return cls(username or os.environ.get('WINT_USERNAME'), password or os.environ.get('WINT_PASSWORD'), **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def account(self):
+        return account_key(self.base_url, self.username)
+
+    def post_report(self, report, payload):
+        """
+        POSTs `payload` to the FinancialReports endpoint `report` (such as 'MonthlyResultReport')
+        and returns the report JSON. Raises an ApiError if the request failed.
+        """
+        response = self.session.post(f'{self.base_url}/api/FinancialReports/{report}', json=payload,
+                                     timeout=self.timeout)
+        raise_for_status(response, f'Wint {report} request failed')
+        return response.json()
+
+    def monthly_result_report(self, start_year, start_month, end_year, end_month):
+        """
+        Fetches the monthly result report for the specified start and end month.
+        """
+        # Prepare the request payload
+        payload = {
+            'startMonth': {
+                'year': start_year,
+                'month': start_month
+            },
+            'endMonth': {
+                'year': end_year,
+                'month': end_month
+            }
+        }
+        return self.post_report('MonthlyResultReport', payload)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(username=None, password=None):
+    """
+    Returns the process-wide WintClient of the credentials (WINT_USERNAME and WINT_PASSWORD by default),
+    so every Wint-backed KPI synced in one process shares one session.
+    """
+    username = username or os.environ.get('WINT_USERNAME')
+    password = password or os.environ.get('WINT_PASSWORD')
+    with _clients_lock:
+        if (username, password) not in _clients:
+            _clients[username, password] = WintClient.from_env(username, password)
+        return _clients[username, password]
+
+
+def window_months():
+    return int(os.environ.get('WINT_WINDOW_MONTHS', DEFAULT_WINDOW_MONTHS))
+
+
+def split_range(start, end, months_per_window=None):
+    """
+    Splits the months from `start` to `end` (both (year, month)) into windows of `months_per_window`
+    (WINT_WINDOW_MONTHS), aligned to the calendar: 3 gives quarters and 12 gives years.
+    Returns [(window_start, window_end), ...] in order; the first and last windows may be partial.
+    """
+    months_per_window = max(months_per_window or window_months(), 1)
+    windows = []
+    for year_month in iter_months(start, end):
+        index = (year_month[0] * 12 + year_month[1] - 1) // months_per_window
+        if windows and windows[-1][0] == index:
+            windows[-1][2] = year_month
+        else:
+            windows.append([index, year_month, year_month])
+    return [(window_start, window_end) for _, window_start, window_end in windows]
+
+
+def stitch_reports(windows, reports):
+    """
+    Joins the reports of consecutive windows into one report whose rows hold the month columns
+    of all windows in order. A row missing from a window gets empty columns for its months.
+    """
+    rows = {}
+    offset = 0
+    for (window_start, window_end), report in zip(windows, reports):
+        for row in report.get('Rows', []):
+            stitched = rows.get(row.get('Id'))
+            if stitched is None:
+                stitched = rows[row.get('Id')] = dict(row, Columns=[])
+            columns = stitched['Columns']
+            columns.extend([{}] * (offset - len(columns)))
+            columns.extend(row.get('Columns', []))
+        offset += len(list(iter_months(window_start, window_end)))
+    return {'Rows': list(rows.values())}
+
+
+def fetch_report_range(start_year, start_month, end_year, end_month, username=None, password=None,
+                       months_per_window=None, max_workers=None, cache=None, client=None, refresh=False):
+    """
+    Fetches the monthly result report of a long range as calendar windows (see split_range()),
+    up to `max_workers` windows at a time over one WintClient, and stitches them back together.
+
+    With a ReportCache, windows that are closed (see is_window_closed()) are served from and stored in
+    the cache, so a rerun only requests the open windows. With `refresh`, closed windows are requested
+    again and their cached reports replaced. If any window fails its ApiError is raised once all
+    windows are done; the closed windows that succeeded are kept in the cache.
+    """
+    start, end = (start_year, start_month), (end_year, end_month)
+    windows = split_range(start, end, months_per_window)
+    client = client or get_client(username, password)
+    max_workers = min(max_workers or client.pool_size, len(windows))
+    account = client.account
+
+    def fetch(window):
+        window_start, window_end = window
+        closed = cache is not None and is_window_closed(window_end)
+        if closed and not refresh:
+            report = cache.load(account, window_start, window_end)
+            if report is not None:
+                return report, False
+        report = client.monthly_result_report(*window_start, *window_end)
+        if closed:
+            cache.store(account, window_start, window_end, report)
+        return report, True
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        futures = [executor.submit(fetch, window) for window in windows]
+    results = [future.result() for future in futures]
+
+    log.info(f'Fetched {sum(fetched for _, fetched in results)} of {len(windows)} Wint report windows.')
+    return stitch_reports(windows, [report for report, _ in results])
+
+
+def month_dates(start_year, start_month, count):
+    """
+    Returns `count` consecutive months from the start month as ISO dates of the first day of the month.
+    """
+    dates = []
+    year, month = start_year, start_month
+    for _ in range(count):
+        dates.append(f'{year:04d}-{month:02d}-01T00:00:00.000Z')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return dates
+
+
+def _rows_by_id(data, row_ids):
+    # The first report row of each wanted Id, in one pass over the rows
+    wanted = set(row_ids)
+    rows_by_id = {}
+    for row in data.get('Rows', []):
+        row_id = row.get('Id')
+        if row_id in wanted and row_id not in rows_by_id:
+            rows_by_id[row_id] = row
+    return rows_by_id
+
+
+def extract_rows(data, row_ids, start_year, start_month):
+    """
+    Extracts the monthly series of each row Id in `row_ids` (such as 'Revenue') from a monthly result
+    report in one pass over its rows. Returns {row_id: [{'date': ..., 'value': ...}]}; amounts are
+    made positive and given in thousands. Row Ids missing from the report get an empty series.
+    """
+    rows_by_id = _rows_by_id(data, row_ids)
+
+    series = {}
+    for row_id in row_ids:
+        columns = rows_by_id.get(row_id, {}).get('Columns', [])
+        dates = month_dates(start_year, start_month, len(columns))
+        series[row_id] = [
+            {
+                'date': date_str,
+                'value': round(abs(column.get('Amount', 0.0)) / 1000)  # Convert to positive
+            }
+            for date_str, column in zip(dates, columns)
+        ]
+    return series
+
+
+def extract_series(data, row_ids, start_year, start_month):
+    """
+    Like extract_rows(), but returns {row_id: MonthlySeries} built straight from the report columns,
+    without a dict and a date string per month.
+    """
+    rows_by_id = _rows_by_id(data, row_ids)
+
+    return {
+        row_id: MonthlySeries.from_range(start_year, start_month, (
+            round(abs(column.get('Amount', 0.0)) / 1000)
+            for column in rows_by_id.get(row_id, {}).get('Columns', [])
+        ))
+        for row_id in row_ids
+    }
+
+
+def get_monthly_revenue_report(start_year, start_month, end_year, end_month, username=None, password=None, **kwargs):
+    """
+    Fetches the monthly result report for the specified start and end month,
+    and returns a JSON object with entries for each month, showing the revenue amount for each,
+    or None if the request failed.
+    """
+    try:
+        data = fetch_report_range(start_year, start_month, end_year, end_month, username, password, **kwargs)
+    except ApiError as e:
+        log.error(f'Error: {e}')
+        return None
+    return {'values': extract_rows(data, ['Revenue'], start_year, start_month)['Revenue']}
+
+
+class WintSource(Source):
+    """
+    Pipeline source of monthly result report rows, {row_id: kpi_name}, from the start month until
+    the current month. The report is fetched once for all rows; extra keyword arguments are passed on
+    to fetch_report_range().
+    """
+    name = 'wint'
+
+    def __init__(self, client, start, kpi_names, end=None, **kwargs):
+        self.client = client
+        self.start = start
+        self.end = end
+        self.kpi_names = kpi_names
+        self.kwargs = kwargs
+
+    def streams(self):
+        current_date = datetime.now()
+        end = self.end or (current_date.year, current_date.month)
+        try:
+            with metrics.phase('fetch'):
+                data = fetch_report_range(*self.start, *end, client=self.client, **self.kwargs)
+        except (ApiError, ValueError) as e:
+            # ValueError: a response that is not JSON
+            raise SourceError(f'Wint report failed: {e}') from e
+        with metrics.phase('aggregate'):
+            series_by_row = extract_series(data, list(self.kpi_names), *self.start)
+        for row_id, series in series_by_row.items():
+            yield KpiStream(self.kpi_names[row_id], series)
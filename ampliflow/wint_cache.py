@@ -0,0 +1,80 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+from .kpi_catalog import cache_dir
+from .months import is_closed
+
+# Year-end postings and corrections land months after the year has ended
+DEFAULT_LATE_DATA_DAYS = 120
+
+
+def late_data_days():
+    return int(os.environ.get('WINT_LATE_DATA_DAYS', DEFAULT_LATE_DATA_DAYS))
+
+
+def is_window_closed(end, today=None, late_days=None):
+    """
+    A report window is closed once its last month is closed, that is `late_days` (WINT_LATE_DATA_DAYS)
+    after it ended, so late bookings are no longer expected.
+    """
+    late_days = late_data_days() if late_days is None else late_days
+    return is_closed(*end, late_days, today)
+
+
+def account_key(base_url, username):
+    return hashlib.sha1(f'{base_url}|{username}'.encode()).hexdigest()[:16]
+
+
+class ReportCache:
+    """
+    SQLite cache of Wint monthly result reports of closed windows, keyed by account and window.
+    """
+
+    def __init__(self, path=None):
+        path = Path(path or cache_dir() / 'wint-reports.sqlite')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS reports ('
+            ' account TEXT NOT NULL,'
+            ' start TEXT NOT NULL,'
+            ' end TEXT NOT NULL,'
+            ' report TEXT NOT NULL,'
+            ' PRIMARY KEY (account, start, end))'
+        )
+        self.connection.commit()
+
+    def load(self, account, start, end):
+        """
+        Returns the cached report of the window from `start` to `end` (both (year, month)), or None.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT report FROM reports WHERE account = ? AND start = ? AND end = ?',
+                (account, _month(start), _month(end))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, account, start, end, report):
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO reports (account, start, end, report) VALUES (?, ?, ?, ?)',
+                (account, _month(start), _month(end), json.dumps(report, separators=(',', ':'))))
+
+    def clear(self, account=None):
+        with self._lock, self.connection:
+            if account is None:
+                self.connection.execute('DELETE FROM reports')
+            else:
+                self.connection.execute('DELETE FROM reports WHERE account = ?', (account,))
+
+    def close(self):
+        self.connection.close()
+
+
+def _month(year_month):
+    return f'{year_month[0]:04d}-{year_month[1]:02d}'
@@ -0,0 +1,70 @@
+"""
+Cold start regression check for the CLI, based on `python -X importtime`.
+
+For the CLI module and every integration it checks the cumulative import time against a budget
+and that integrations which do not use GA4 never import the google gRPC stack. Exits with
+status 1 when a budget is exceeded, so it can run in CI.
+
+Run with `python benchmarks/bench_importtime.py [cli budget ms]`.
+"""
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CLI_BUDGET_MS = 50
+# module: (budget in ms, whether it may import google.*)
+INTEGRATIONS = {
+    'ampliflow.integrations.wint': (300, False),
+    'ampliflow.integrations.mailerlite': (300, False),
+    'ampliflow.integrations.custom_list': (300, False),
+    'ampliflow.integrations.ga_visitors': (1000, True),
+    'ampliflow.integrations.ga_conversions': (1000, True),
+}
+
+
+def import_times(module):
+    """
+    Returns ({imported module: cumulative microseconds}) for a fresh `import module`.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Importing {module} failed:\n{result.stderr}')
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def check(module, budget_ms, allow_google):
+    times = import_times(module)
+    elapsed_ms = times[module] / 1000
+    google = sorted(name for name in times if name.startswith('google'))
+    ok = elapsed_ms <= budget_ms and (allow_google or not google)
+
+    status = 'ok' if ok else 'FAIL'
+    print(f'{status:4} {module:40} {elapsed_ms:8.1f} ms  (budget {budget_ms} ms)')
+    if google and not allow_google:
+        print(f'     imports the GA4 stack: {", ".join(google[:3])}...')
+    return ok
+
+
+def main():
+    cli_budget = float(sys.argv[1]) if len(sys.argv) > 1 else CLI_BUDGET_MS
+    results = [check('ampliflow.cli', cli_budget, False)]
+    for module, (budget_ms, allow_google) in INTEGRATIONS.items():
+        results.append(check(module, budget_ms, allow_google))
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Builds 100k custom list item payloads with the original per-item prepare_properties,
+which interprets the property schema every call, and with a compiled ListSchema.
+
+Run with `python benchmarks/bench_list_schema.py [count] [property count]`.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ampliflow.custom_lists import ListSchema
+
+TYPES = ['string', 'int', 'boolean', 'date', 'datetime', 'multiSelect', 'multiCheckbox', 'link']
+
+
+def make_properties(count):
+    properties = [{'id': 'title-id', 'label': 'Title', 'type': 'String'}]
+    for number in range(count - 1):
+        properties.append({'id': f'prop-{number}', 'label': f'Property {number}', 'type': TYPES[number % len(TYPES)]})
+    return properties
+
+
+def interpreted_prepare_properties(custom_list_properties, title_value):
+    # The original custom-list-example.py implementation, minus its sys.exit on a missing title
+    properties_payload = []
+    for prop in custom_list_properties:
+        prop_label = prop.get('label', '').lower()
+        prop_type = prop.get('type', '').lower()
+        property_payload = {'id': prop.get('id')}
+        if prop_label == 'title':
+            if prop_type == 'int':
+                property_payload['value'] = int(title_value)
+            else:
+                property_payload['value'] = title_value
+        elif prop_type == 'string':
+            property_payload['value'] = ''
+        elif prop_type == 'int':
+            property_payload['value'] = 0
+        elif prop_type == 'boolean':
+            property_payload['value'] = False
+        elif prop_type in ['date', 'datetime']:
+            property_payload['value'] = None
+        elif prop_type in ['multiselect', 'multicheckbox']:
+            property_payload['selectedIds'] = []
+        else:
+            property_payload['value'] = None
+        properties_payload.append(property_payload)
+    return properties_payload
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    property_count = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    properties = make_properties(property_count)
+    titles = [f'Item {number}' for number in range(count)]
+
+    start = time.perf_counter()
+    expected = [interpreted_prepare_properties(properties, title) for title in titles]
+    interpreted = time.perf_counter() - start
+
+    start = time.perf_counter()
+    schema = ListSchema(properties)
+    compiled = [schema.payload(title) for title in titles]
+    compiled_time = time.perf_counter() - start
+
+    assert compiled == expected
+    print(f'{count} payloads, {property_count} properties')
+    print(f'{"interpreted prepare_properties":32} {interpreted:8.3f}s')
+    print(f'{"ListSchema.payload":32} {compiled_time:8.3f}s  {interpreted / compiled_time:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares month bucketing of 1M 'YYYY-MM-DD HH:MM:SS' timestamps: the original per-row
+strptime/strftime/split approach against ampliflow.months (and its NumPy path if installed).
+
+Run with `python benchmarks/bench_months.py [count]`.
+"""
+import sys
+import time
+import random
+import collections
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ampliflow import months
+
+
+def make_timestamps(count):
+    random.seed(0)
+    start = datetime(2015, 1, 1).timestamp()
+    end = datetime(2025, 1, 1).timestamp()
+    return [
+        datetime.fromtimestamp(random.uniform(start, end)).strftime('%Y-%m-%d %H:%M:%S')
+        for _ in range(count)
+    ]
+
+
+def strptime_baseline(timestamps):
+    counts_by_month = collections.Counter()
+    for timestamp in timestamps:
+        date_obj = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+        counts_by_month[date_obj.strftime('%Y-%m')] += 1
+    totals = {}
+    for month_str, count in counts_by_month.items():
+        year, month = map(int, month_str.split('-'))
+        totals[(year, month)] = count
+    return totals
+
+
+def prefix_count(timestamps):
+    return months.month_totals(months.count_by_month(timestamps))
+
+
+def timed(func, timestamps):
+    start = time.perf_counter()
+    result = func(timestamps)
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    timestamps = make_timestamps(count)
+
+    candidates = [('strptime + strftime + split', strptime_baseline), ('months.count_by_month', prefix_count)]
+    try:
+        import numpy  # noqa: F401
+        candidates.append(('months.count_by_month_numpy', months.count_by_month_numpy))
+    except ImportError:
+        print('numpy not installed, skipping the NumPy path.')
+
+    baseline_time, expected = timed(strptime_baseline, timestamps)
+    print(f'{count} timestamps')
+    for name, func in candidates:
+        elapsed, result = timed(func, timestamps) if func is not strptime_baseline else (baseline_time, expected)
+        assert result == expected, name
+        print(f'{name:32} {elapsed:8.3f}s  {baseline_time / elapsed:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
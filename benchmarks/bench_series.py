@@ -0,0 +1,63 @@
+"""
+Holds 10 years of monthly values for 10k KPIs as lists of {'year', 'month', 'value'} dicts and
+as MonthlySeries, merging a second source into each, and compares time and memory.
+
+Run with `python benchmarks/bench_series.py [KPI count] [months]`.
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ampliflow import months
+from ampliflow.series import MonthlySeries
+
+
+def make_points(count, offset):
+    return [(2015 + (number + offset) // 12, (number + offset) % 12 + 1, number * 7 % 1000) for number in range(count)]
+
+
+def with_dicts(kpis, first, second):
+    series = {}
+    for kpi in range(kpis):
+        totals = {(year, month): value for year, month, value in first}
+        totals.update(((year, month), value) for year, month, value in second)
+        series[kpi] = months.to_values(totals)
+    return series
+
+
+def with_series(kpis, first, second):
+    return {kpi: MonthlySeries.from_points(first).merge(MonthlySeries.from_points(second)) for kpi in range(kpis)}
+
+
+def measure(function, *args):
+    # Timed without tracemalloc, which slows down every allocation
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    kpis = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    first, second = make_points(count, 0), make_points(count // 2, count // 2)
+
+    dicts, dict_time, dict_peak = measure(with_dicts, kpis, first, second)
+    series, series_time, series_peak = measure(with_series, kpis, first, second)
+
+    assert series[0].to_values() == dicts[0]
+    print(f'{kpis} KPIs, {count} months, merged with {len(second)} months')
+    print(f'{"lists of dicts":16} {dict_time:8.3f}s  {dict_peak / 2 ** 20:8.1f} MiB')
+    print(f'{"MonthlySeries":16} {series_time:8.3f}s  {series_peak / 2 ** 20:8.1f} MiB  '
+          f'{series_time / dict_time:4.2f}x the time, {dict_peak / series_peak:4.1f}x less memory')
+
+
+if __name__ == '__main__':
+    main()
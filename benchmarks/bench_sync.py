@@ -0,0 +1,174 @@
+"""
+Runs the sync commands end to end against local stub servers (see stub_servers.py), so
+performance changes can be measured without touching the live services.
+
+Every scenario runs its `python -m ampliflow` command in a fresh process with its own cache
+directory, first cold and then with the caches of the earlier runs. For every run it reports
+the wall time (including imports), the requests the stubs answered and the peak RSS. GA4 runs
+use FakeGaClient instead of the gRPC API.
+
+Run with `python benchmarks/bench_sync.py [--latency MS] [--months N] [--subscribers N] ... [scenario ...]`,
+see --help for the size settings.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# scenario: CLI arguments, given the first month to sync as YYYY-MM
+SCENARIOS = {
+    'wint': lambda start: ['wint', '--start', start, '--row', 'Revenue=Revenue', '--row', 'Costs=Costs'],
+    'mailerlite': lambda start: ['mailerlite'],
+    'ga-visitors': lambda start: ['ga-visitors'],
+    'ga-conversions': lambda start: ['ga-conversions'],
+    'custom-list': lambda start: ['custom-list', '--bulk', '100'],
+}
+
+
+def peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def child(options):
+    """
+    Runs one CLI command in this process and writes its timings to options['result'].
+    """
+    started = time.perf_counter()
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.path.insert(0, str(ROOT))
+    fake_ga = None
+    if options['argv'][0].startswith('ga-'):
+        from stub_servers import FakeGaClient
+        from ampliflow import ga4
+
+        fake_ga = ga4._client = FakeGaClient(options['latency'], options['ga_rows'])
+
+    from ampliflow.cli import main
+
+    exit_code = main(['--env-file', options['env_file'], *options['argv']])
+    result = {
+        'exit_code': exit_code,
+        'wall': time.perf_counter() - started,
+        'ga_calls': fake_ga.calls if fake_ga else 0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    Path(options['result']).write_text(json.dumps(result), encoding='utf-8')
+
+
+def run(stub, scenario, argv, cache_dir, args):
+    """
+    Runs `argv` in a child process against `stub` and returns its result, with the requests per endpoint.
+    """
+    env_file = Path(cache_dir) / 'bench.env'
+    env_file.touch()
+    result_path = Path(cache_dir) / 'result.json'
+    env = {
+        **os.environ,
+        'AF_BASE_URL': stub.url,
+        'AF_API_KEY': 'bench-api-key',
+        'AF_CACHE_DIR': str(cache_dir),
+        'WINT_BASE_URL': stub.url,
+        'WINT_USERNAME': 'bench',
+        'WINT_PASSWORD': 'bench',
+        'MAILERLITE_BASE_URL': f'{stub.url}/mailerlite',
+        'MAILERLITE_API_KEY': 'bench-api-key',
+        'MAILERLITE_GROUP_ID': '1',
+        'GA4_PROPERTY_ID': '123456',
+    }
+    if args.mailerlite_rate is not None:
+        env['MAILERLITE_RATE_LIMIT'] = str(args.mailerlite_rate)
+    options = {
+        'argv': argv,
+        'env_file': str(env_file),
+        'result': str(result_path),
+        'latency': args.latency / 1000,
+        'ga_rows': args.ga_rows,
+    }
+
+    before = dict(stub.requests)
+    process = subprocess.run([sys.executable, __file__, '--child', json.dumps(options)],
+                             cwd=ROOT, env=env, capture_output=True, text=True)
+    if process.returncode != 0 and not result_path.exists():
+        raise RuntimeError(f'{scenario} failed:\n{process.stdout}{process.stderr}')
+
+    result = json.loads(result_path.read_text(encoding='utf-8'))
+    result_path.unlink()
+    result['endpoints'] = {
+        endpoint: count - before.get(endpoint, 0)
+        for endpoint, count in sorted(stub.requests.items())
+        if count != before.get(endpoint, 0)
+    }
+    if result['ga_calls']:
+        result['endpoints']['ga4 report calls'] = result['ga_calls']
+    result['requests'] = sum(result['endpoints'].values())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end sync benchmark against local stub servers.')
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f'Scenarios to run (default: all): {", ".join(SCENARIOS)}.')
+    parser.add_argument('--latency', type=float, default=20, help='Milliseconds per request (default: 20).')
+    parser.add_argument('--months', type=int, default=36, help='Months of Wint and MailerLite data (default: 36).')
+    parser.add_argument('--subscribers', type=int, default=20000, help='Subscribers in the MailerLite group (default: 20000).')
+    parser.add_argument('--report-rows', type=int, default=100, help='Extra rows in every Wint report (default: 100).')
+    parser.add_argument('--kpis', type=int, default=200, help='KPIs in the AmpliFlow catalog (default: 200).')
+    parser.add_argument('--ga-rows', type=int, default=500, help='GA4 report rows per month (default: 500).')
+    parser.add_argument('--mailerlite-rate', type=float, metavar='RATE',
+                        help='MailerLite requests per second, 0 for unlimited (default: the client default, '
+                             'as shipped).')
+    parser.add_argument('--runs', type=int, default=2, help='Runs per scenario, the first one cold (default: 2).')
+    parser.add_argument('--detail', action='store_true', help='Show the requests per endpoint.')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(json.loads(args.child))
+    unknown = [scenario for scenario in args.scenarios if scenario not in SCENARIOS]
+    if unknown:
+        parser.error(f'Unknown scenario: {", ".join(unknown)}')
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from stub_servers import StubServer, months_back
+
+    year, month = months_back(args.months)
+    start = f'{year:04d}-{month:02d}'
+    stub = StubServer(args.latency / 1000, kpis=args.kpis, report_rows=args.report_rows,
+                      subscribers=args.subscribers, months=args.months)
+    if args.mailerlite_rate is None:
+        mailerlite_rate = 'the client default'
+    else:
+        mailerlite_rate = f'{args.mailerlite_rate:g} req/s' if args.mailerlite_rate else 'unlimited'
+    print(f'latency {args.latency:g} ms, {args.months} months, {args.subscribers} subscribers, '
+          f'{args.report_rows} report rows, {args.kpis} KPIs, {args.ga_rows} GA4 rows per month, '
+          f'MailerLite rate {mailerlite_rate}')
+    print(f'{"scenario":16} {"run":>4} {"wall":>9} {"requests":>9} {"peak RSS":>10}  exit')
+
+    failed = False
+    with stub:
+        for scenario in args.scenarios or SCENARIOS:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                for number in range(1, args.runs + 1):
+                    result = run(stub, scenario, SCENARIOS[scenario](start), cache_dir, args)
+                    failed |= result['exit_code'] != 0
+                    print(f'{scenario:16} {number:>4} {result["wall"]:8.3f}s {result["requests"]:>9} '
+                          f'{result["peak_rss_mb"]:7.1f} MB  {result["exit_code"]}')
+                    if args.detail:
+                        for endpoint, count in result['endpoints'].items():
+                            print(f'{"":21} {count:>6}  {endpoint}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Local stand-ins for the APIs the integrations talk to, for offline end-to-end benchmarks.
+
+StubServer answers the AmpliFlow Exec endpoints (kpis, manual-data-sources, custom-lists,
+custom-list-items), Wint's FinancialReports/MonthlyResultReport and MailerLite's groups and
+subscribers (under /mailerlite) on one local port. FakeGaClient replaces BetaAnalyticsDataClient
+with run_report and batch_run_reports. Both wait `latency` seconds per call and generate as much
+data as their size settings ask for.
+"""
+import json
+import time
+import threading
+from datetime import date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# The KPIs the integrations sync into by default
+KPI_NAMES = ['Revenue', 'Costs', 'Subscribers', 'Total website visitors', 'Inbound leads - ampliflow.se']
+CUSTOM_LIST_NAME = 'GDPR_en_Registry'
+
+
+def months_back(count, today=None):
+    """
+    Returns (year, month) of the month `count - 1` months before this month, so `count` months end now.
+    """
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - (count - 1)
+    return index // 12, index % 12 + 1
+
+
+class StubServer:
+    """
+    Threaded HTTP server emulating AmpliFlow, Wint and MailerLite.
+
+    `kpis` is the size of the KPI catalog, `report_rows` the rows of every Wint report besides
+    Revenue and Costs, and `subscribers` the size of the MailerLite group, spread over `months`.
+    Requests are counted per endpoint in `requests`. fail() makes an endpoint answer with errors.
+    """
+
+    def __init__(self, latency=0.0, kpis=200, report_rows=100, subscribers=10000, months=36):
+        self.latency = latency
+        self.kpis = [{'id': f'kpi-{number}', 'name': name} for number, name in enumerate(KPI_NAMES)]
+        self.kpis += [{'id': f'kpi-{number}', 'name': f'KPI {number}'}
+                      for number in range(len(KPI_NAMES), max(kpis, len(KPI_NAMES)))]
+        self.report_rows = report_rows
+        self.subscribers = subscribers
+        self.months = months
+        self.requests = {}
+        self.failures = {}
+        self._lock = threading.Lock()
+        self._item_ids = 0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def handle_request(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, payload, headers = stub.route(self.command, self.path, self.headers, body)
+                if status is None:
+                    # Drop the connection after reading the request, without an answer
+                    self.close_connection = True
+                    return
+                data = b'' if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = handle_request
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def fail(self, endpoint, *statuses, headers=None):
+        """
+        Makes the next requests to `endpoint`, such as 'GET exec/kpis', answer with `statuses` in
+        order, one per request, before it answers normally again. A status of None drops the
+        connection without an answer.
+        """
+        with self._lock:
+            self.failures.setdefault(endpoint, []).extend((status, headers or {}) for status in statuses)
+
+    def _count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            failures = self.failures.get(endpoint)
+            return failures.pop(0) if failures else None
+
+    def route(self, method, path, headers, body):
+        """
+        Returns (status, JSON payload or None, extra headers) for a request.
+        """
+        parts = urlsplit(path)
+        segments = parts.path.strip('/').split('/')
+        if segments[:2] == ['api', 'Exec']:
+            # /api/Exec/<path>/<api key>
+            endpoint = '/'.join(segment for segment in segments[2:-1] if not segment.startswith('kpi-'))
+            name = f'{method} exec/{endpoint}'
+        elif segments[:2] == ['api', 'FinancialReports']:
+            name = f'{method} wint/{segments[2]}'
+        elif segments[0] == 'mailerlite':
+            name = f'{method} mailerlite/{segments[-1] if len(segments) > 3 else "group"}'
+        else:
+            name = f'{method} unknown'
+
+        failure = self._count(name)
+        if failure is not None:
+            status, failure_headers = failure
+            return status, {'error': 'Stub failure'}, failure_headers
+
+        if segments[:2] == ['api', 'Exec']:
+            return self.exec_route(method, endpoint, segments[2:-1], headers, body)
+        if segments[:2] == ['api', 'FinancialReports']:
+            return 200, self.result_report(body['startMonth'], body['endMonth']), {}
+        if segments[0] == 'mailerlite':
+            if len(segments) == 3:
+                return 200, {'id': segments[2], 'total': self.subscribers}, {}
+            query = parse_qs(parts.query)
+            return 200, self.subscriber_page(int(query['page'][0]), int(query['limit'][0])), {}
+        return 404, {'error': f'No stub for {path}'}, {}
+
+    def exec_route(self, method, endpoint, segments, headers, body):
+        if endpoint == 'kpis':
+            etag = f'"{len(self.kpis)}"'
+            if headers.get('If-None-Match') == etag:
+                return 304, None, {'ETag': etag}
+            return 200, self.kpis, {'ETag': etag}
+        if endpoint == 'kpi/manual-data-sources':
+            if method == 'GET':
+                return 200, [{'id': f'ds-{segments[-1]}', 'name': 'Manual'}], {}
+            return 204, None, {}
+        if endpoint == 'custom-lists':
+            return 200, [{'id': 'list-1', 'name': CUSTOM_LIST_NAME, 'properties': [
+                {'id': 'title', 'label': 'Title', 'type': 'String'},
+                {'id': 'owner', 'label': 'Owner', 'type': 'String'},
+                {'id': 'count', 'label': 'Count', 'type': 'Int'},
+                {'id': 'done', 'label': 'Done', 'type': 'Boolean'},
+                {'id': 'due', 'label': 'Due', 'type': 'Date'},
+                {'id': 'tags', 'label': 'Tags', 'type': 'MultiSelect'},
+            ]}], {}
+        if endpoint == 'custom-list-items':
+            if method == 'POST':
+                with self._lock:
+                    self._item_ids += 1
+                    return 201, f'item-{self._item_ids}', {}
+            return 204, None, {}
+        return 404, {'error': f'No stub for {endpoint}'}, {}
+
+    def result_report(self, start, end):
+        count = (end['year'] - start['year']) * 12 + end['month'] - start['month'] + 1
+        row_ids = ['Revenue', 'Costs'] + [f'Row{number}' for number in range(self.report_rows)]
+        return {'Rows': [
+            {
+                'Id': row_id,
+                'Name': row_id,
+                'Columns': [{'Amount': (number + 1) * 1000.0 * (month + 1), 'Budget': 0.0} for month in range(count)],
+            }
+            for number, row_id in enumerate(row_ids)
+        ]}
+
+    def subscriber_page(self, page, limit):
+        first = (page - 1) * limit
+        year, month = months_back(self.months)
+        subscribers = []
+        for number in range(first, min(first + limit, self.subscribers)):
+            index = year * 12 + month - 1 + number * self.months // self.subscribers
+            subscribers.append({
+                'id': number,
+                'email': f'subscriber{number}@example.com',
+                'name': f'Subscriber {number}',
+                'type': 'active',
+                'date_subscribe': f'{index // 12}-{index % 12 + 1:02d}-{number % 28 + 1:02d} 10:{number % 60:02d}:00',
+                'fields': [{'key': 'email', 'value': f'subscriber{number}@example.com', 'type': 'TEXT'}],
+            })
+        return subscribers
+
+
+class FakeGaClient:
+    """
+    Stands in for BetaAnalyticsDataClient. Reports have `rows_per_month` rows for every month
+    in their date range, as a breakdown by an extra dimension would, and honor limit and offset.
+    """
+
+    def __init__(self, latency=0.0, rows_per_month=10):
+        from google.analytics.data_v1beta.types import (
+            BatchRunReportsResponse, RunReportResponse, Row, DimensionValue, MetricValue,
+        )
+
+        self._types = BatchRunReportsResponse, RunReportResponse, Row, DimensionValue, MetricValue
+        self.latency = latency
+        self.rows_per_month = rows_per_month
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _report(self, request):
+        _, RunReportResponse, Row, DimensionValue, MetricValue = self._types
+        date_range = request.date_ranges[0]
+        start = date.fromisoformat(date_range.start_date)
+        end = date.fromisoformat(date_range.end_date) if date_range.end_date != 'today' else date.today()
+        year_months = [
+            (index // 12, index % 12 + 1)
+            for index in range(start.year * 12 + start.month - 1, end.year * 12 + end.month)
+        ]
+        row_count = len(year_months) * self.rows_per_month
+        offset = request.offset
+        limit = request.limit or 10000
+        rows = []
+        for number in range(offset, min(offset + limit, row_count)):
+            year, month = year_months[number // self.rows_per_month]
+            rows.append(Row(
+                dimension_values=[DimensionValue(value=str(year)), DimensionValue(value=f'{month:02d}')],
+                metric_values=[MetricValue(value=str(number % 97 + 1))],
+            ))
+        return RunReportResponse(rows=rows, row_count=row_count)
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def run_report(self, request):
+        self._call()
+        return self._report(request)
+
+    def batch_run_reports(self, request):
+        self._call()
+        BatchRunReportsResponse = self._types[0]
+        return BatchRunReportsResponse(reports=[self._report(report) for report in request.requests])
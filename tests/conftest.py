@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The local stub servers of the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+
+@pytest.fixture
+def stub():
+    from stub_servers import StubServer
+
+    with StubServer(subscribers=2500, months=12) as server:
+        yield server
+
+
+@pytest.fixture
+def exec_client(stub):
+    from ampliflow.exec_client import ExecClient
+
+    with ExecClient(stub.url, 'test-key', max_retries=2) as client:
+        client.session.backoff = 0.001
+        yield client
@@ -0,0 +1,48 @@
+import pytest
+
+from ampliflow.async_sync import run_sync
+from ampliflow.checkpoint import Journal
+from ampliflow.kpi_catalog import KpiCatalog
+
+
+class CrashingClient:
+    """
+    Exec client whose PATCH of the data source in `crash_on` raises an unexpected error.
+    """
+    base_url = 'http://exec.test'
+    api_key = 'test-key'
+
+    def __init__(self, kpi_names, crash_on):
+        self.kpis = [{'id': f'kpi-{number}', 'name': name} for number, name in enumerate(kpi_names)]
+        self.crash_on = crash_on
+        self.updated = []
+
+    def get_kpis_conditional(self, etag=None, last_modified=None):
+        return self.kpis, None, None
+
+    def get_manual_data_sources(self, kpi_id):
+        return [{'id': f'ds-{kpi_id}'}]
+
+    def update_manual_data_source(self, data_source_id, values_payload):
+        if data_source_id == self.crash_on:
+            raise RuntimeError('crash')
+        self.updated.append(data_source_id)
+
+
+def test_kpis_pushed_before_a_crash_are_checkpointed(tmp_path):
+    client = CrashingClient(['A', 'B'], crash_on='ds-kpi-1')
+    checkpoint = Journal(tmp_path / 'journal.sqlite').checkpoint('test')
+    jobs = [('A', [{'year': 2024, 'month': 1, 'value': 1}]), ('B', [{'year': 2024, 'month': 1, 'value': 2}])]
+
+    with pytest.raises(RuntimeError):
+        run_sync(client, jobs, concurrency=1, catalog=KpiCatalog(client, persist=False), delta=False,
+                 checkpoint=checkpoint)
+
+    assert client.updated == ['ds-kpi-0']
+    assert list(checkpoint.load('kpi')) == ['A']
+
+    client.crash_on = None
+    results = run_sync(client, jobs, concurrency=1, catalog=KpiCatalog(client, persist=False), delta=False,
+                       checkpoint=checkpoint)
+    assert [result.status for result in results] == ['unchanged', 'updated']
+    assert client.updated == ['ds-kpi-0', 'ds-kpi-1']
@@ -0,0 +1,117 @@
+import json
+import argparse
+
+import pytest
+
+from ampliflow.config import Config
+from ampliflow.custom_lists import sync_items
+from ampliflow.item_index import ItemIndex
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.content = b'' if body is None else json.dumps(body).encode()
+        self.text = self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeClient:
+    """
+    Exec client that creates items with ids item-1, item-2, ... and fails the titles in `failing`.
+    """
+    base_url = 'http://exec.test'
+    api_key = 'test-key'
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.requests = []
+        self.items = {}
+
+    def send(self, method, path, payload=None, headers=None):
+        self.requests.append((method, payload))
+        title = payload['properties'][0]['value']
+        if title in self.failing:
+            return FakeResponse(500, {'error': 'failed'})
+        if method == 'POST':
+            item_id = f'item-{len(self.items) + 1}'
+            self.items[item_id] = title
+            return FakeResponse(201, item_id)
+        self.items[payload['id']] = title
+        return FakeResponse(204)
+
+    def get_custom_lists(self):
+        return [{'id': 'list-1', 'name': 'Registry', 'properties': [{'id': 'title', 'label': 'Title', 'type': 'String'}]}]
+
+    def create_custom_list_item(self, custom_list_id, properties_payload):
+        return self.send('POST', 'custom-list-items', {'properties': properties_payload}).json()
+
+    def update_custom_list_item(self, item_id, custom_list_id, properties_payload):
+        self.send('PATCH', 'custom-list-items', {'id': item_id, 'properties': properties_payload})
+
+
+def rows(*titles):
+    return [(title, [{'id': 'title', 'value': title}]) for title in titles]
+
+
+def test_sync_after_partial_failure_sends_only_the_failed_rows(tmp_path):
+    index = ItemIndex(tmp_path / 'items.sqlite')
+    client = FakeClient(failing={'C'})
+
+    summary = sync_items(client, 'list-1', rows('A', 'B', 'C'), index, concurrency=1)
+    assert summary.created == 2
+    assert [key for key, _ in summary.failed] == ['C']
+
+    client.failing.clear()
+    client.requests.clear()
+    summary = sync_items(client, 'list-1', rows('A', 'B', 'C'), index, concurrency=1)
+
+    assert (summary.created, summary.updated, summary.skipped) == (1, 0, 2)
+    assert client.requests == [('POST', {'customListId': 'list-1', 'properties': [{'id': 'title', 'value': 'C'}]})]
+    known = index.load('list-1')
+    assert {key: client.items[item_id] for key, (item_id, _) in known.items()} == {'A': 'A', 'B': 'B', 'C': 'C'}
+
+    # A change to C updates C's own item, not another row's
+    client.requests.clear()
+    changed = [('C', [{'id': 'title', 'value': 'C'}, {'id': 'note', 'value': 'changed'}])]
+    summary = sync_items(client, 'list-1', changed, index, concurrency=1)
+    assert summary.updated == 1
+    assert client.requests[0][1]['id'] == known['C'][0]
+
+
+@pytest.fixture
+def custom_list_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('AF_CACHE_DIR', str(tmp_path))
+    from ampliflow.integrations import custom_list
+
+    client = FakeClient()
+    monkeypatch.setattr(custom_list.ExecClient, 'from_env', classmethod(lambda cls: client))
+    return custom_list, client
+
+
+def test_resumed_custom_list_example_does_not_create_its_items_again(custom_list_env):
+    custom_list, client = custom_list_env
+    config = Config(af_base_url=client.base_url, af_api_key=client.api_key)
+    client.failing = {'Bulk item 50'}
+
+    args = argparse.Namespace(list_name='Registry', resume=False, bulk=100)
+    assert custom_list.main(config, args) == 1
+    created = set(client.items.values())
+    assert {'Updated Item 1', 'Item 2', 'Bulk item 1'} <= created
+    assert 'Bulk item 50' not in created
+
+    client.failing.clear()
+    client.requests.clear()
+    assert custom_list.main(config, argparse.Namespace(list_name='Registry', resume=True, bulk=100)) == 0
+    assert [(method, payload['properties'][0]['value']) for method, payload in client.requests] == \
+        [('POST', 'Bulk item 50')]
+
+
+def test_custom_list_example_creates_no_bulk_items_by_default(custom_list_env):
+    custom_list, client = custom_list_env
+    config = Config(af_base_url=client.base_url, af_api_key=client.api_key)
+
+    assert custom_list.main(config, argparse.Namespace(list_name='Registry', resume=False, bulk=0)) == 0
+    assert sorted(client.items.values()) == ['Item 2', 'Updated Item 1']
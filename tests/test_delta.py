@@ -0,0 +1,40 @@
+from ampliflow.delta import SnapshotStore, diff_values, index_values, push_values
+
+
+class RecordingClient:
+    def __init__(self):
+        self.updates = []
+
+    def update_manual_data_source(self, data_source_id, values_payload):
+        self.updates.append((data_source_id, values_payload))
+
+
+def values(*points):
+    return [{'year': year, 'month': month, 'value': value} for year, month, value in points]
+
+
+def test_diff_values_returns_new_and_changed_months():
+    old = index_values([{'date': '2024-01-01T00:00:00.000Z', 'value': 1}] + values((2024, 2, 2)))
+    assert diff_values(old, values((2024, 1, 1), (2024, 2, 3), (2024, 3, 4))) == values((2024, 2, 3), (2024, 3, 4))
+
+
+def test_push_values_sends_only_what_changed_since_the_snapshot(tmp_path):
+    client = RecordingClient()
+    snapshots = SnapshotStore(tmp_path / 'snapshots.json')
+
+    assert push_values(client, {'id': 'ds-1'}, values((2024, 1, 1), (2024, 2, 2)), True, snapshots) == \
+        values((2024, 1, 1), (2024, 2, 2))
+    # A new store reads the saved snapshot back
+    snapshots = SnapshotStore(tmp_path / 'snapshots.json')
+    assert push_values(client, {'id': 'ds-1'}, values((2024, 1, 1), (2024, 2, 5)), True, snapshots) == \
+        values((2024, 2, 5))
+    assert push_values(client, {'id': 'ds-1'}, values((2024, 1, 1), (2024, 2, 5)), True, snapshots) == []
+    assert len(client.updates) == 2
+
+
+def test_push_values_prefers_the_values_of_the_data_source():
+    client = RecordingClient()
+    data_source = {'id': 'ds-1', 'values': values((2024, 1, 1))}
+    assert push_values(client, data_source, values((2024, 1, 1), (2024, 2, 2)), True) == values((2024, 2, 2))
+    assert push_values(client, data_source, values((2024, 1, 1)), False) == values((2024, 1, 1))
+    assert client.updates == [('ds-1', values((2024, 2, 2))), ('ds-1', values((2024, 1, 1)))]
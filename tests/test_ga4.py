@@ -0,0 +1,19 @@
+from ampliflow import ga4
+from ampliflow.ga4 import GaKpi, GaSource, parse_properties
+from ampliflow.series import MonthlySeries
+
+
+def test_properties_of_the_same_kpi_are_summed(monkeypatch):
+    kpi_names = parse_properties('123,456', 'Total website visitors')
+    values_by_property = {
+        '123': {'Total website visitors': [{'year': 2024, 'month': 1, 'value': 10},
+                                           {'year': 2024, 'month': 2, 'value': 20}]},
+        '456': {'Total website visitors': [{'year': 2024, 'month': 2, 'value': 5},
+                                           {'year': 2024, 'month': 3, 'value': 7}]},
+    }
+    monkeypatch.setattr(ga4, 'run_properties', lambda kpis_by_property, **kwargs: values_by_property)
+
+    source = GaSource({property_id: [GaKpi(kpi_name, 'activeUsers')] for property_id, kpi_name in kpi_names.items()})
+    streams = list(source.streams())
+
+    assert streams == [('Total website visitors', MonthlySeries.from_points([(2024, 1, 10), (2024, 2, 25), (2024, 3, 7)]))]
@@ -0,0 +1,35 @@
+from ampliflow.checkpoint import Journal
+from ampliflow.mailerlite import MailerLiteClient, get_subscriber_counts_by_month
+
+
+def client_for(stub, window=4):
+    return MailerLiteClient('test-key', window=window, base_url=f'{stub.url}/mailerlite', rate=0)
+
+
+def test_pages_are_fetched_once_and_counted_in_full(stub):
+    counts = get_subscriber_counts_by_month(client_for(stub), 1)
+    assert sum(counts.values()) == 2500
+    assert len(counts) == 12
+    assert stub.requests['GET mailerlite/subscribers'] == 3
+
+
+def test_a_grown_group_is_probed_one_page_at_a_time(stub):
+    stub.subscribers = 3500
+    client = client_for(stub)
+    client.get_group_total = lambda group_id: 2500
+
+    counts = get_subscriber_counts_by_month(client, 1)
+    assert sum(counts.values()) == 3500
+    assert stub.requests['GET mailerlite/subscribers'] == 4
+
+
+def test_a_resumed_count_continues_after_the_last_counted_page(stub, tmp_path):
+    journal = Journal(tmp_path / 'journal.sqlite')
+    # A run that stopped after counting page 2
+    journal.checkpoint('mailerlite:1').record('page', 1, {'page': 2, 'counts': {'2020-01': 2000},
+                                                          'subscribers': 2000, 'done': False})
+
+    counts = get_subscriber_counts_by_month(client_for(stub), 1, journal.checkpoint('mailerlite:1', resume=True))
+    assert stub.requests['GET mailerlite/subscribers'] == 1
+    assert counts[2020, 1] == 2000
+    assert sum(counts.values()) == 2500
@@ -0,0 +1,29 @@
+from ampliflow.series import MonthlySeries
+
+
+def test_from_points_sorts_and_keeps_the_last_value_of_a_month():
+    series = MonthlySeries.from_points([(2024, 3, 3), (2024, 1, 1), (2024, 3, 4)])
+    assert list(series) == [(2024, 1, 1), (2024, 3, 4)]
+    assert series.to_values() == [{'year': 2024, 'month': 1, 'value': 1}, {'year': 2024, 'month': 3, 'value': 4}]
+
+
+def test_merge_and_diff():
+    old = MonthlySeries.from_points([(2023, 12, 1), (2024, 1, 2)])
+    new = MonthlySeries.from_points([(2024, 1, 5), (2024, 2, 6)])
+    merged = old.merge(new)
+    assert list(merged) == [(2023, 12, 1), (2024, 1, 5), (2024, 2, 6)]
+    assert list(merged.diff(old)) == [(2024, 1, 5), (2024, 2, 6)]
+    assert list(merged.diff(old, missing=False)) == [(2024, 1, 5)]
+
+
+def test_floats_are_sent_as_ints_when_whole():
+    series = MonthlySeries.from_points([(2024, 1, 1.5), (2024, 2, 2.0)])
+    assert [entry['value'] for entry in series.to_values()] == [1.5, 2]
+
+
+def test_resample_and_sum():
+    series = MonthlySeries.from_range(2023, 11, [1, 2, 3, 4, 5])
+    assert list(series.resample(3)) == [(2023, 10, 3), (2024, 1, 12)]
+    assert list(series.resample(12, how='last')) == [(2023, 1, 2), (2024, 1, 5)]
+    assert series.sum((2024, 1), (2024, 2)) == 7
+    assert series.get(2024, 3) == 5 and series.get(2024, 4) is None
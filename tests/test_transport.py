@@ -0,0 +1,93 @@
+import json
+import socket
+
+import pytest
+
+from ampliflow.kpi_catalog import KpiCatalog
+from ampliflow.transport import ClientError, Session, TransportError, raise_for_status
+
+
+@pytest.fixture
+def session():
+    with Session(max_retries=2, backoff=0.001) as session:
+        yield session
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_get_is_retried_until_it_succeeds(stub, session):
+    stub.fail('GET exec/kpis', 503, 500)
+    response = session.get(f'{stub.url}/api/Exec/kpis/test-key')
+    assert response.status_code == 200
+    assert stub.requests['GET exec/kpis'] == 3
+
+
+def test_get_gives_up_after_max_retries(stub, session):
+    stub.fail('GET exec/kpis', 502, 502, 502, 502)
+    assert session.get(f'{stub.url}/api/Exec/kpis/test-key').status_code == 502
+    assert stub.requests['GET exec/kpis'] == 3
+
+
+def test_client_errors_are_not_retried(stub, session):
+    stub.fail('GET exec/kpis', 404)
+    response = session.get(f'{stub.url}/api/Exec/kpis/test-key')
+    assert stub.requests['GET exec/kpis'] == 1
+    with pytest.raises(ClientError):
+        raise_for_status(response, 'Error fetching KPIs')
+
+
+def test_post_is_retried_only_when_it_was_not_processed(stub, session):
+    url = f'{stub.url}/api/Exec/custom-list-items/test-key'
+    stub.fail('POST exec/custom-list-items', 500)
+    assert session.post(url, json={}).status_code == 500
+    assert stub.requests['POST exec/custom-list-items'] == 1
+
+    stub.fail('POST exec/custom-list-items', 429, 503, headers={'Retry-After': '0'})
+    assert session.post(url, json={}).status_code == 201
+    assert stub.requests['POST exec/custom-list-items'] == 4
+
+
+def test_post_is_not_retried_after_a_dropped_connection(stub, session):
+    stub.fail('POST exec/custom-list-items', None)
+    with pytest.raises(TransportError):
+        session.post(f'{stub.url}/api/Exec/custom-list-items/test-key', json={})
+    assert stub.requests['POST exec/custom-list-items'] == 1
+
+    stub.fail('GET exec/kpis', None)
+    assert session.get(f'{stub.url}/api/Exec/kpis/test-key').status_code == 200
+    assert stub.requests['GET exec/kpis'] == 2
+
+
+def test_post_is_retried_after_a_refused_connect(session):
+    from ampliflow.metrics import metrics
+
+    metrics.reset()
+    with pytest.raises(TransportError) as error:
+        session.post(f'http://127.0.0.1:{free_port()}/items/secret-key', json={}, endpoint='POST items')
+    assert 'secret-key' not in str(error.value)
+    assert metrics.to_json()['endpoints']['POST items']['retries'] == 2
+
+
+def test_catalog_keeps_its_cached_copy_after_one_failed_revalidation(stub, exec_client, tmp_path):
+    cache_path = tmp_path / 'kpis.json'
+    KpiCatalog(exec_client, cache_path=cache_path).refresh()
+    assert stub.requests['GET exec/kpis'] == 1
+
+    # A catalog cached by an earlier run, past its TTL, while the catalog endpoint is down
+    cached = json.loads(cache_path.read_text())
+    cache_path.write_text(json.dumps(dict(cached, fetched_at=0)))
+    stub.fail('GET exec/kpis', *[503] * 100)
+
+    catalog = KpiCatalog(exec_client, cache_path=cache_path)
+    for _ in range(50):
+        assert catalog.find_by_name('Revenue')['id'] == 'kpi-0'
+        assert catalog.find_by_name('Missing KPI') is None
+        assert catalog.find_by_id('kpi-1')['name'] == 'Costs'
+
+    # One revalidation with its retries
+    assert stub.requests['GET exec/kpis'] == 1 + 3
+    assert json.loads(cache_path.read_text())['fetched_at'] == 0
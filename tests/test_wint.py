@@ -0,0 +1,50 @@
+from datetime import date
+
+from ampliflow.wint import fetch_report_range, stitch_reports
+from ampliflow.wint_cache import ReportCache, is_window_closed
+
+
+class FakeWintClient:
+    pool_size = 2
+    account = 'account'
+
+    def __init__(self):
+        self.requests = []
+
+    def monthly_result_report(self, start_year, start_month, end_year, end_month):
+        self.requests.append(((start_year, start_month), (end_year, end_month)))
+        count = (end_year - start_year) * 12 + end_month - start_month + 1
+        return {'Rows': [{'Id': 'Revenue', 'Columns': [{'Amount': 1000.0}] * count}]}
+
+
+def test_a_year_stays_open_until_its_year_end_postings_are_expected():
+    assert not is_window_closed((2024, 12), today=date(2025, 2, 1))
+    assert is_window_closed((2024, 12), today=date(2025, 6, 1))
+
+
+def test_refresh_requests_the_cached_windows_again(tmp_path):
+    cache = ReportCache(tmp_path / 'reports.sqlite')
+    client = FakeWintClient()
+
+    fetch_report_range(2022, 1, 2023, 12, months_per_window=12, cache=cache, client=client)
+    client.requests.clear()
+    fetch_report_range(2022, 1, 2023, 12, months_per_window=12, cache=cache, client=client)
+    assert client.requests == []
+
+    report = fetch_report_range(2022, 1, 2023, 12, months_per_window=12, cache=cache, client=client, refresh=True)
+    assert sorted(client.requests) == [((2022, 1), (2022, 12)), ((2023, 1), (2023, 12))]
+    assert len(report['Rows'][0]['Columns']) == 24
+
+
+def test_stitched_windows_keep_the_months_of_rows_missing_from_a_window():
+    windows = [((2024, 11), (2024, 12)), ((2025, 1), (2025, 3))]
+    reports = [
+        {'Rows': [{'Id': 'Revenue', 'Columns': [{'Amount': 1}, {'Amount': 2}]}]},
+        {'Rows': [{'Id': 'Costs', 'Columns': [{'Amount': 5}] * 3},
+                  {'Id': 'Revenue', 'Columns': [{'Amount': 3}, {'Amount': 4}, {'Amount': 5}]}]},
+    ]
+
+    rows = {row['Id']: row['Columns'] for row in stitch_reports(windows, reports)['Rows']}
+
+    assert [column.get('Amount') for column in rows['Revenue']] == [1, 2, 3, 4, 5]
+    assert [column.get('Amount') for column in rows['Costs']] == [None, None, 5, 5, 5]